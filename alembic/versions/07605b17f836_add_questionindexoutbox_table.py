@@ -0,0 +1,31 @@
+"""Add QuestionIndexOutbox table
+
+Revision ID: 07605b17f836
+Revises: cbcf3d2d9512
+Create Date: 2026-10-18 16:02:13.550918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07605b17f836'
+down_revision: Union[str, None] = 'cbcf3d2d9512'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('questionindexoutbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('questionindexoutbox')
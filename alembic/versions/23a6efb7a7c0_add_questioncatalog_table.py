@@ -0,0 +1,48 @@
+"""Add QuestionCatalog table
+
+Revision ID: 23a6efb7a7c0
+Revises: 432e9b99c18a
+Create Date: 2026-10-18 12:37:19.004822
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23a6efb7a7c0'
+down_revision: Union[str, None] = '432e9b99c18a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('questioncatalog',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('package', sa.String(length=256), nullable=True),
+    sa.Column('question_type', postgresql.ENUM('Б', 'БД', 'ДБ', 'И', 'Л', 'Ч', 'ЧБ', 'ЧД', 'Э', 'Я', name='questiontype', create_type=False), nullable=False),
+    sa.Column('question_count', sa.Integer(), nullable=False),
+    sa.Column('tour_count', sa.Integer(), nullable=False),
+    sa.Column('min_question_id', sa.Integer(), nullable=False),
+    sa.Column('max_question_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_questioncatalog_type_package', 'questioncatalog', ['question_type', 'package'], unique=False)
+    op.create_index(op.f('ix_question_package'), 'question', ['package'], unique=False)
+    op.execute(
+        'INSERT INTO questioncatalog (package, question_type, '
+        'question_count, tour_count, min_question_id, max_question_id) '
+        'SELECT package, question_type, count(*), count(DISTINCT tour), '
+        'min(id), max(id) FROM question '
+        'WHERE is_published = true AND is_condemned = false '
+        'GROUP BY package, question_type'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_package'), table_name='question')
+    op.drop_index('ix_questioncatalog_type_package', table_name='questioncatalog')
+    op.drop_table('questioncatalog')
@@ -0,0 +1,39 @@
+"""Add random_key column to Question table
+
+Revision ID: 432e9b99c18a
+Revises: d1012bc826e1
+Create Date: 2026-10-18 10:12:41.318544
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '432e9b99c18a'
+down_revision: Union[str, None] = 'd1012bc826e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ELIGIBLE_QUESTION_CLAUSE = sa.and_(
+    sa.column('is_published') == sa.true(),
+    sa.column('is_condemned') == sa.false()
+)
+
+
+def upgrade() -> None:
+    op.add_column('question', sa.Column('random_key', sa.Float(), nullable=True))
+    op.execute('UPDATE question SET random_key = random()')
+    op.alter_column('question', 'random_key',
+               existing_type=sa.Float(),
+               nullable=False)
+    op.create_index('ix_question_type_random_key', 'question', ['question_type', 'random_key'], unique=False, postgresql_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.create_index('ix_question_random_key', 'question', ['random_key'], unique=False, postgresql_where=ELIGIBLE_QUESTION_CLAUSE)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_random_key', table_name='question', postgresql_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.drop_index('ix_question_type_random_key', table_name='question', postgresql_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.drop_column('question', 'random_key')
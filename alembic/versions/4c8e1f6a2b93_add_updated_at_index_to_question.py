@@ -0,0 +1,35 @@
+"""Add updated_at index to question
+
+Revision ID: 4c8e1f6a2b93
+Revises: d3f5a8c0e914
+Create Date: 2026-10-20 09:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e1f6a2b93'
+down_revision: Union[str, None] = 'd3f5a8c0e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # индекс строится без блокировки записи в таблицу вопросов
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_question_updated_at', 'question', ['updated_at'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_question_updated_at', table_name='question',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,60 @@
+"""Add version and updated_at columns to Question table
+
+Revision ID: 5e2f8a1c9d47
+Revises: 07605b17f836
+Create Date: 2026-10-18 21:40:12.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2f8a1c9d47'
+down_revision: Union[str, None] = '07605b17f836'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ELIGIBLE_QUESTION_CLAUSE = sa.and_(
+    sa.column('is_published') == sa.true(),
+    sa.column('is_condemned') == sa.false()
+)
+
+
+def upgrade() -> None:
+    # значения по умолчанию нужны только для заполнения существующих записей
+    op.add_column('question', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('question', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.alter_column('question', 'version', server_default=None)
+    op.alter_column('question', 'updated_at', server_default=None)
+    # индексы строятся без блокировки записи в таблицу вопросов
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_question_id_version', 'question',
+            ['id', 'version', 'updated_at'],
+            unique=False,
+            postgresql_where=ELIGIBLE_QUESTION_CLAUSE,
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_question_user_id_version', 'question',
+            ['user_id', 'id', 'version'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_question_user_id_version', table_name='question',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_question_id_version', table_name='question',
+            postgresql_concurrently=True
+        )
+    op.drop_column('question', 'updated_at')
+    op.drop_column('question', 'version')
@@ -0,0 +1,40 @@
+"""Add trigram index to question text
+
+Revision ID: cbcf3d2d9512
+Revises: 23a6efb7a7c0
+Create Date: 2026-10-18 14:05:27.481236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cbcf3d2d9512'
+down_revision: Union[str, None] = '23a6efb7a7c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.drop_index('ix_question_question', table_name='question')
+    # индекс строится без блокировки записи в таблицу вопросов
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_question_question_trgm', 'question', ['question'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'question': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_question_question_trgm', table_name='question',
+            postgresql_concurrently=True
+        )
+    op.create_index('ix_question_question', 'question', ['question'], unique=False)
@@ -0,0 +1,46 @@
+"""Add updated_at to user questions version index
+
+Revision ID: d3f5a8c0e914
+Revises: b9d41c7e2a06
+Create Date: 2026-10-19 11:03:18.920641
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f5a8c0e914'
+down_revision: Union[str, None] = 'b9d41c7e2a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # индексы перестраиваются без блокировки записи в таблицу вопросов
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_question_user_id_version', table_name='question',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_question_user_id_version', 'question',
+            ['user_id', 'id', 'version', 'updated_at'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_question_user_id_version', table_name='question',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_question_user_id_version', 'question',
+            ['user_id', 'id', 'version'],
+            unique=False,
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,45 @@
+"""Add random_key column to Question table
+
+Revision ID: 1ceed03ead52
+Revises: 97e0a201d4bc
+Create Date: 2026-10-18 10:14:05.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ceed03ead52'
+down_revision: Union[str, None] = '97e0a201d4bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ELIGIBLE_QUESTION_CLAUSE = sa.and_(
+    sa.column('is_published') == sa.true(),
+    sa.column('is_condemned') == sa.false()
+)
+
+
+def upgrade() -> None:
+    op.add_column('question', sa.Column('random_key', sa.Float(), nullable=True))
+    # random() в SQLite возвращает 64-битное целое число со знаком
+    op.execute(
+        'UPDATE question SET random_key = '
+        'abs(random()) / 9223372036854775808.0'
+    )
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.alter_column('random_key',
+               existing_type=sa.Float(),
+               nullable=False)
+    op.create_index('ix_question_type_random_key', 'question', ['question_type', 'random_key'], unique=False, sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.create_index('ix_question_random_key', 'question', ['random_key'], unique=False, sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_random_key', table_name='question', sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.drop_index('ix_question_type_random_key', table_name='question', sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_column('random_key')
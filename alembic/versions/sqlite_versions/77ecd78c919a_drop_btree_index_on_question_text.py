@@ -0,0 +1,25 @@
+"""Drop btree index on question text
+
+Revision ID: 77ecd78c919a
+Revises: f1594ac0f6fb
+Create Date: 2026-10-18 14:06:02.915370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '77ecd78c919a'
+down_revision: Union[str, None] = 'f1594ac0f6fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_question_question', table_name='question')
+
+
+def downgrade() -> None:
+    op.create_index('ix_question_question', 'question', ['question'], unique=False)
@@ -0,0 +1,42 @@
+"""Add version and updated_at columns to Question table
+
+Revision ID: 8c3d6e0b7f25
+Revises: b79c03423cc2
+Create Date: 2026-10-18 21:42:57.118403
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3d6e0b7f25'
+down_revision: Union[str, None] = 'b79c03423cc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ELIGIBLE_QUESTION_CLAUSE = sa.and_(
+    sa.column('is_published') == sa.true(),
+    sa.column('is_condemned') == sa.false()
+)
+
+
+def upgrade() -> None:
+    # SQLite не допускает добавления столбца NOT NULL без значения
+    # по умолчанию, поэтому значения существующих записей задаются в нем
+    op.add_column('question', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('question', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text("'1970-01-01 00:00:00.000000'"), nullable=False))
+    op.execute("UPDATE question SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')")
+    op.create_index('ix_question_id_version', 'question', ['id', 'version', 'updated_at'], unique=False, sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+    op.create_index('ix_question_user_id_version', 'question', ['user_id', 'id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_user_id_version', table_name='question')
+    op.drop_index('ix_question_id_version', table_name='question', sqlite_where=ELIGIBLE_QUESTION_CLAUSE)
+    # столбцы удаляются без пересоздания таблицы, иначе будут потеряны
+    # триггеры синхронизации индекса question_fts
+    op.execute('ALTER TABLE question DROP COLUMN updated_at')
+    op.execute('ALTER TABLE question DROP COLUMN version')
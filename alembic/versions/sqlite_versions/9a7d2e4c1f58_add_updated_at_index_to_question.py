@@ -0,0 +1,25 @@
+"""Add updated_at index to question
+
+Revision ID: 9a7d2e4c1f58
+Revises: f0b2c9d7a361
+Create Date: 2026-10-20 09:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7d2e4c1f58'
+down_revision: Union[str, None] = 'f0b2c9d7a361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_question_updated_at', 'question', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_updated_at', table_name='question')
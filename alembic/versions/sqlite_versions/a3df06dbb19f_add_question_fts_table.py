@@ -0,0 +1,51 @@
+"""Add question_fts full-text index
+
+Revision ID: a3df06dbb19f
+Revises: 77ecd78c919a
+Create Date: 2026-10-18 15:21:44.207518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3df06dbb19f'
+down_revision: Union[str, None] = '77ecd78c919a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE question_fts USING fts5(question, "
+        "content='question', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER question_fts_insert AFTER INSERT ON question BEGIN "
+        "INSERT INTO question_fts(rowid, question) "
+        "VALUES (new.id, new.question); END"
+    )
+    op.execute(
+        "CREATE TRIGGER question_fts_delete AFTER DELETE ON question BEGIN "
+        "INSERT INTO question_fts(question_fts, rowid, question) "
+        "VALUES ('delete', old.id, old.question); END"
+    )
+    op.execute(
+        "CREATE TRIGGER question_fts_update AFTER UPDATE OF question "
+        "ON question BEGIN "
+        "INSERT INTO question_fts(question_fts, rowid, question) "
+        "VALUES ('delete', old.id, old.question); "
+        "INSERT INTO question_fts(rowid, question) "
+        "VALUES (new.id, new.question); END"
+    )
+    op.execute("INSERT INTO question_fts(question_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER question_fts_update')
+    op.execute('DROP TRIGGER question_fts_delete')
+    op.execute('DROP TRIGGER question_fts_insert')
+    op.execute('DROP TABLE question_fts')
@@ -0,0 +1,31 @@
+"""Add QuestionIndexOutbox table
+
+Revision ID: b79c03423cc2
+Revises: a3df06dbb19f
+Create Date: 2026-10-18 16:02:13.550918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b79c03423cc2'
+down_revision: Union[str, None] = 'a3df06dbb19f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('questionindexoutbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('questionindexoutbox')
@@ -0,0 +1,37 @@
+"""Add unique index on package and question type to QuestionCatalog table
+
+Revision ID: e6a7f3b15c82
+Revises: 8c3d6e0b7f25
+Create Date: 2026-10-19 10:21:44.307512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a7f3b15c82'
+down_revision: Union[str, None] = '8c3d6e0b7f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # каталог пересобирается, чтобы удалить записи, продублированные
+    # одновременными пересчетами
+    op.execute('DELETE FROM questioncatalog')
+    op.execute(
+        'INSERT INTO questioncatalog (package, question_type, '
+        'question_count, tour_count, min_question_id, max_question_id) '
+        'SELECT package, question_type, count(*), count(DISTINCT tour), '
+        'min(id), max(id) FROM question '
+        'WHERE is_published = 1 AND is_condemned = 0 '
+        'GROUP BY package, question_type'
+    )
+    op.create_index('uq_questioncatalog_package_type', 'questioncatalog', [sa.text("coalesce(package, '')"), 'question_type'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_questioncatalog_package_type', table_name='questioncatalog')
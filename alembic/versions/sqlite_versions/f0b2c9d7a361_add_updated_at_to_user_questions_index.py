@@ -0,0 +1,27 @@
+"""Add updated_at to user questions version index
+
+Revision ID: f0b2c9d7a361
+Revises: e6a7f3b15c82
+Create Date: 2026-10-19 11:03:18.920641
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0b2c9d7a361'
+down_revision: Union[str, None] = 'e6a7f3b15c82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_question_user_id_version', table_name='question')
+    op.create_index('ix_question_user_id_version', 'question', ['user_id', 'id', 'version', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_user_id_version', table_name='question')
+    op.create_index('ix_question_user_id_version', 'question', ['user_id', 'id', 'version'], unique=False)
@@ -0,0 +1,47 @@
+"""Add QuestionCatalog table
+
+Revision ID: f1594ac0f6fb
+Revises: 1ceed03ead52
+Create Date: 2026-10-18 12:39:52.611730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1594ac0f6fb'
+down_revision: Union[str, None] = '1ceed03ead52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('questioncatalog',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('package', sa.String(length=256), nullable=True),
+    sa.Column('question_type', sa.Enum('Б', 'БД', 'ДБ', 'И', 'Л', 'Ч', 'ЧБ', 'ЧД', 'Э', 'Я', name='questiontype'), nullable=False),
+    sa.Column('question_count', sa.Integer(), nullable=False),
+    sa.Column('tour_count', sa.Integer(), nullable=False),
+    sa.Column('min_question_id', sa.Integer(), nullable=False),
+    sa.Column('max_question_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_questioncatalog_type_package', 'questioncatalog', ['question_type', 'package'], unique=False)
+    op.create_index(op.f('ix_question_package'), 'question', ['package'], unique=False)
+    op.execute(
+        'INSERT INTO questioncatalog (package, question_type, '
+        'question_count, tour_count, min_question_id, max_question_id) '
+        'SELECT package, question_type, count(*), count(DISTINCT tour), '
+        'min(id), max(id) FROM question '
+        'WHERE is_published = 1 AND is_condemned = 0 '
+        'GROUP BY package, question_type'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_package'), table_name='question')
+    op.drop_index('ix_questioncatalog_type_package', table_name='questioncatalog')
+    op.drop_table('questioncatalog')
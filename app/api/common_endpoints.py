@@ -1,4 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.core.metrics import metrics
+from app.core.users import current_superuser
+from app.crud.questions_outbox import get_question_index_outbox_stats
+from app.crud.questions_pool import get_question_pool_stats
 
 router = APIRouter(
     prefix='',
@@ -18,3 +25,25 @@ async def api_root():
         'Swagger url': '/docs/',
         'ReDoc url': '/redoc/'
     }
+
+
+@router.get(
+    '/metrics',
+    summary='Метрики процесса API.',
+    dependencies=[Depends(current_superuser)]
+)
+async def get_metrics(
+    session: AsyncSession = Depends(get_async_session)
+) -> dict[str, dict[str, float]]:
+    """
+    Текущие значения метрик процесса API, общая для всех процессов
+    статистика пулов случайных вопросов и отставание поискового индекса
+    от БД. Доступно только администратору.
+    """
+    return {
+        **metrics.snapshot(),
+        'question_pools': await get_question_pool_stats(),
+        'question_index_outbox': await get_question_index_outbox_stats(
+            session
+        ),
+    }
@@ -1,28 +1,41 @@
-from random import choices
+from collections.abc import Mapping
 
-from fastapi import APIRouter, Depends, Path, Query, Request
-from fastapi_cache.decorator import cache
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response)
+from fastapi.responses import JSONResponse
 from pydantic.json_schema import SkipJsonSchema
-from sqlalchemy import false, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.utils import (check_superuser_or_user_who_added,
-                           get_package_questions_list)
+from app.api.utils import (QuestionsJSONResponse, check_not_modified,
+                           check_superuser_or_user_who_added,
+                           decode_cursor, get_etag, get_package_questions_list,
+                           get_question_rows_response,
+                           get_questions_content, get_questions_response,
+                           get_search_headers)
+from app.core.cache import cache
 import app.core.constants as const
 from app.core.db import get_async_session
 from app.core.config import limiter
+from app.core.metrics import metrics
 from app.core.users import current_superuser, current_user
-from app.crud.questions_api import (create_question, edit_question,
-                                    get_initial_query, get_question_or_404,
+from app.crud.questions_api import (create_question,
+                                    delete_question_from_db, edit_question,
+                                    get_question_or_404,
+                                    get_question_version,
                                     get_questions_by_list_order,
-                                    get_random_package,
+                                    get_random_package, get_random_questions,
                                     get_valid_question_or_404)
-from app.elasticsearch.logic import ElasticSearchQuestion
-from app.models.questions import Question, QuestionType
+from app.crud.questions_response_cache import question_key_builder
+from app.crud.questions_search_cache import (get_cached_search_questions,
+                                             get_cached_suggestions)
+from app.models.questions import QuestionType
 from app.models.users import User
 from app.schemas.questions import (EmailForSendingPackage, QuestionCreate,
                                    QuestionDB, QuestionDBWithStatus,
-                                   QuestionStatusUpdate, QuestionUpdate,)
+                                   QuestionSearchResult, QuestionStatusUpdate,
+                                   QuestionSuggestion, QuestionUpdate,)
+from app.search.base import SearchBackend, SearchBackendUnavailableError
+from app.search.dependencies import get_search_backend
 from app.tasks.questions import send_email
 
 router = APIRouter(
@@ -52,7 +65,7 @@ async def get_random_package_set(
     #     questions_list, package_name = get_package_questions_list(package)
     #     for addr in email_addresses.email:
     #         send_email.delay(addr, questions_list, package_name)
-    return package
+    return get_question_rows_response(package)
 
 
 @router.get(
@@ -87,16 +100,12 @@ async def get_random_questions_set(
     # """
     if question_type:
         question_type = question_type.name
-    query = await get_initial_query(session, question_type)
-    questions = await session.execute(query)
-    questions = questions.scalars().all()
-    choices_quantity = min(quantity, len(questions))
-    questions = choices(questions, k=choices_quantity)
+    questions = await get_random_questions(session, question_type, quantity)
     # if email_addresses.email:
     #     questions_list, _ = get_package_questions_list(questions)
     #     for addr in email_addresses.email:
     #         send_email.delay(addr, questions_list)
-    return questions
+    return get_question_rows_response(questions)
 
 
 @router.get(
@@ -118,35 +127,51 @@ async def search_questions(
         ge=1,
         le=const.MAX_QUESTIONS_QUANTITY,
         description='Количество вопросов в выдаче.'),
+    cursor: str | SkipJsonSchema[None] = Query(
+        default=None,
+        description=('Курсор следующей страницы результатов (заголовок '
+                     'X-Next-Cursor предыдущего ответа).')
+    ),
     # email_addresses: EmailForSendingPackage,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_session),
+    search_backend: SearchBackend = Depends(get_search_backend)
 ):
     """
     Поиск по тексту вопроса. Регистр не имеет значения.
-    Можно указать количество вопросов в выдаче.
+    Можно указать количество вопросов в выдаче. Если найдено больше
+    вопросов, в заголовке X-Next-Cursor ответа передается курсор
+    следующей страницы результатов.
     """
     # Если необходимо отправить выборку по почте - укажите адрес в теле запроса.
     # """
-    questions = await session.execute(
-        select(Question)
-        .filter(
-            Question.is_condemned == false(),
-            Question.is_published == true(),
-            Question.question.icontains(search_pattern)
+    search_after = decode_cursor(cursor, 1)
+
+    async def search() -> tuple[list[Mapping], dict]:
+        page = await search_backend.substring_search_questions(
+            session, search_pattern, quantity, search_after=search_after
         )
-        .limit(quantity)
+        return page.questions, {
+            'headers': get_search_headers(page.next_search_after)
+        }
+
+    questions, page_info = await get_cached_search_questions(
+        'substring',
+        search_pattern,
+        None,
+        quantity,
+        {'cursor': cursor},
+        search
     )
-    questions = questions.scalars().all()
     # if email_addresses.email:
     #     questions_list, _ = get_package_questions_list(questions)
     #     for addr in email_addresses.email:
     #         send_email.delay(addr, questions_list)
-    return questions
+    return get_questions_response(questions, page_info['headers'])
 
 
 @router.get(
     '/full-text-search',
-    response_model=list[QuestionDB],
+    response_model=list[QuestionDB] | QuestionSearchResult,
     response_model_exclude_none=True,
     summary='Полнотекстовый и нечеткий поиск по тексту вопросов.'
 )
@@ -168,19 +193,158 @@ async def elastic_search_questions(
         ge=1,
         le=const.MAX_QUESTIONS_QUANTITY,
         description='Количество вопросов в выдаче.'),
-    session: AsyncSession = Depends(get_async_session)
+    fresh: bool = Query(
+        default=False,
+        description=('Загрузить найденные вопросы из Базы, а не из '
+                     'поискового индекса (актуально сразу после '
+                     'изменения вопросов).')
+    ),
+    cursor: str | SkipJsonSchema[None] = Query(
+        default=None,
+        description=('Курсор следующей страницы результатов (заголовок '
+                     'X-Next-Cursor предыдущего ответа).')
+    ),
+    package: str | SkipJsonSchema[None] = Query(
+        default=None,
+        description='Выбрать только вопросы из указанного пакета.'
+    ),
+    authors: str | SkipJsonSchema[None] = Query(
+        default=None,
+        description='Выбрать только вопросы указанных авторов.'
+    ),
+    facets: bool = Query(
+        default=False,
+        description=('Вернуть вместе с вопросами количество найденных '
+                     'вопросов по типам, пакетам и авторам.')
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    search_backend: SearchBackend = Depends(get_search_backend)
 ):
     """
     Полнотекстовый поиск по тексту вопросов.
-    Можно указать количество вопросов в выдаче и тип поиска.
+    Можно указать количество вопросов в выдаче и тип поиска. Если найдено
+    больше вопросов, в заголовке X-Next-Cursor ответа передается курсор
+    следующей страницы результатов.
+
+    Поиск выполняется ступенями: сначала точное совпадение фразы, затем
+    совпадение основ слов и только затем нечеткий поиск - если предыдущая
+    ступень нашла меньше вопросов, чем запрошено. Если поисковый движок
+    недоступен, выполняется поиск по подстроке в Базе (ступень fallback),
+    а при запросе следующей страницы результатов движка возвращается
+    статус 503. Ступень, давшая результат, передается в заголовке
+    X-Search-Stage ответа.
+
+    Если указан параметр facets, ответ содержит найденные вопросы (questions)
+    и фасеты (facets) - количество найденных вопросов по значениям полей
+    question_type, package и authors. Выборку можно ограничить пакетом
+    и авторами (точное значение поля).
     """
-    es = ElasticSearchQuestion()
-    search_result = es.search_questions(
-        search_pattern, quantity, question_type
+    search_after = decode_cursor(
+        cursor, 4, len(search_backend.search_stages) + 1
+    )
+
+    async def fetch(pk_list: list[int]) -> list[Mapping]:
+        questions = await get_questions_by_list_order(pk_list, session)
+        return [question._mapping for question in questions]
+
+    facet_filters = {
+        field: value
+        for field, value in (('package', package), ('authors', authors))
+        if value is not None
+    }
+
+    async def search() -> tuple[list[Mapping], dict]:
+        try:
+            page = await search_backend.search_questions(
+                session, search_pattern, quantity, question_type,
+                search_after, facet_filters, facets
+            )
+        except SearchBackendUnavailableError:
+            raise HTTPException(
+                status_code=503,
+                detail=('Поисковый движок недоступен, следующая страница '
+                        'результатов не может быть получена. Повторите '
+                        'запрос позднее или начните поиск заново.'),
+                headers={'Retry-After': str(int(
+                    const.ELASTICSEARCH_BREAKER_RESET_TIMEOUT.total_seconds()
+                ))}
+            )
+        metrics.inc(f'question_search_stage_{page.stage}_total')
+        questions = page.questions
+        if fresh:
+            questions = await fetch([question['id'] for question in questions])
+        return questions, {
+            'headers': get_search_headers(page.next_search_after, page.stage),
+            'facets': page.facets
+        }
+
+    questions, page_info = await get_cached_search_questions(
+        'full-text',
+        search_pattern,
+        question_type.name if question_type else None,
+        quantity,
+        {
+            'cursor': cursor,
+            'facets': facets,
+            'fresh': fresh,
+            **facet_filters
+        },
+        search
+    )
+    if not facets:
+        return get_questions_response(questions, page_info['headers'])
+    return QuestionsJSONResponse(
+        {
+            'questions': get_questions_content(questions),
+            'facets': page_info['facets']
+        },
+        headers=page_info['headers']
     )
-    question_pk_list = es.get_questions_pk_list(search_result)
-    questions = await get_questions_by_list_order(question_pk_list, session)
-    return questions
+
+
+@router.get(
+    '/suggest',
+    response_model=list[QuestionSuggestion],
+    summary='Подсказки при наборе текста поиска.'
+)
+@limiter.limit(const.SUGGEST_THROTTLING_RATE)
+async def suggest_questions(
+    *,
+    request: Request,
+    prefix: str = Query(
+        ...,
+        min_length=const.MIN_SUGGEST_PREFIX_LENGTH,
+        description='Начало набираемого текста.'
+    ),
+    question_type: QuestionType | SkipJsonSchema[None] = Query(
+        default=None,
+        description=('Тип вопросов. Если оставить поле пустым - '
+                     'будут выбраны вопросы случайных категорий.')
+    ),
+    quantity: int = Query(
+        default=const.DEFAULT_SUGGESTIONS_QUANTITY,
+        ge=1,
+        le=const.MAX_SUGGESTIONS_QUANTITY,
+        description='Количество подсказок.'),
+    session: AsyncSession = Depends(get_async_session),
+    search_backend: SearchBackend = Depends(get_search_backend)
+):
+    """
+    Подсказки для поиска по тексту вопросов: фрагменты наиболее
+    релевантных вопросов, содержащих все слова набранного текста
+    (последнее слово может быть не дописано).
+    """
+    async def suggest() -> list[dict]:
+        return await search_backend.suggest_questions(
+            session, prefix, quantity, question_type
+        )
+
+    return JSONResponse(await get_cached_suggestions(
+        prefix,
+        question_type.name if question_type else None,
+        quantity,
+        suggest
+    ))
 
 
 @router.post(
@@ -207,22 +371,50 @@ async def add_question(
     return new_question
 
 
+async def check_question_etag(
+    request: Request,
+    response: Response,
+    id: int = Path(..., gt=0, description='id вопроса в Базе.'),
+    session: AsyncSession = Depends(get_async_session)
+) -> str | None:
+    """
+    Возвращает ETag версии вопроса (None, если вопрос не найден или
+    не разрешен к выдаче). Если версия вопроса у клиента актуальна,
+    запрос завершается ответом 304. ETag включает время изменения вопроса:
+    в SQLite id удаленного вопроса может быть присвоен новому вопросу
+    с той же начальной версией.
+    """
+    version = await get_question_version(id, session)
+    if version is None:
+        return None
+    etag = get_etag(id, version.version, version.updated_at)
+    check_not_modified(request, response, etag, version.updated_at)
+    return etag
+
+
 @router.get(
     '/{id}',
     response_model=QuestionDB,
     response_model_exclude_none=True,
     summary='Получить вопрос.'
 )
-@cache(expire=const.DEFAULT_CACHING_TIME)
+@cache(
+    expire=const.QUESTION_CACHING_TIME,
+    key_builder=question_key_builder
+)
 @limiter.limit(const.BASE_THROTTLING_RATE)
 async def get_question(
     *,
     request: Request,
     id: int = Path(..., gt=0, description='id вопроса в Базе.'),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_session),
+    etag: str | None = Depends(check_question_etag)
 ):
     """
-    Получить вопрос из Базы по его уникальному идентификатору.
+    Получить вопрос из Базы по его уникальному идентификатору. Ответ
+    содержит заголовки ETag и Last-Modified; при повторном запросе
+    с заголовком If-None-Match (или If-Modified-Since) неизмененный вопрос
+    не передается (ответ 304).
     """
     question = await get_valid_question_or_404(id, session)
     return question
@@ -250,8 +442,6 @@ async def modify_question(
     question = await get_question_or_404(id, session)
     check_superuser_or_user_who_added(question, user)
     question = await edit_question(question, modified_question, user, session)
-    es = ElasticSearchQuestion()
-    es.delete_question_from_index(question)
     return question
 
 
@@ -277,11 +467,6 @@ async def modify_question_status(
     """
     question = await get_question_or_404(id, session)
     question = await edit_question(question, modified_status, user, session)
-    es = ElasticSearchQuestion()
-    if question.is_published:
-        es.add_or_update_question_in_index(question)
-    else:
-        es.delete_question_from_index(question)
     return question
 
 
@@ -302,8 +487,5 @@ async def delete_question(
     """
     question = await get_question_or_404(id, session)
     check_superuser_or_user_who_added(question, user)
-    await session.delete(question)
-    await session.commit()
-    es = ElasticSearchQuestion()
-    es.delete_question_from_index(question)
+    await delete_question_from_db(question, session)
     return {'message': f'Вопрос с id = {id} удален из Базы.'}
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, Request
-from fastapi_cache.decorator import cache
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils import check_not_modified, get_etag
+from app.core.cache import cache
 from app.core.config import limiter
 import app.core.constants as const
 from app.core.db import get_async_session
 from app.core.users import auth_backend, current_user, fastapi_users
+from app.crud.questions_api import (get_question_rows_query,
+                                    get_user_questions_version)
+from app.crud.questions_response_cache import user_questions_key_builder
 from app.models.questions import Question
 from app.models.users import User
 from app.schemas.questions import QuestionDB
@@ -26,6 +29,23 @@ router.include_router(
 )
 
 
+async def check_user_questions_etag(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user)
+) -> str:
+    """
+    Возвращает ETag сводной версии списка вопросов, добавленных текущим
+    пользователем. Если версия списка у клиента актуальна, запрос
+    завершается ответом 304.
+    """
+    version = await get_user_questions_version(user.id, session)
+    etag = get_etag(user.id, *version)
+    check_not_modified(request, response, etag)
+    return etag
+
+
 @router.get(
     '/users/questions',
     response_model=list[QuestionDB],
@@ -33,21 +53,23 @@ router.include_router(
     tags=['Пользователи'],
     summary='Получить вопросы, добавленные в Базу текущим пользователем.'
 )
-@cache(expire=const.DEFAULT_CACHING_TIME)
+@cache(
+    expire=const.QUESTION_CACHING_TIME,
+    key_builder=user_questions_key_builder
+)
 @limiter.limit(const.BASE_THROTTLING_RATE)
 async def get_users_questions(
     request: Request,
     session: AsyncSession = Depends(get_async_session),
-    user: User = Depends(current_user)
-
+    user: User = Depends(current_user),
+    etag: str = Depends(check_user_questions_etag)
 ):
     questions = await session.execute(
-        select(Question).
-        select_from(Question).
+        get_question_rows_query().
         filter(Question.user_id == user.id)
     )
-    questions = questions.scalars().all()
-    return questions
+    # Ответ кэшируется, поэтому возвращается список словарей, а не JSONResponse
+    return [_._asdict() for _ in questions.all()]
 
 
 router.include_router(
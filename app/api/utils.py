@@ -1,15 +1,30 @@
+import base64
+import binascii
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timezone
 from email.message import EmailMessage
+from email.utils import format_datetime, parsedate_to_datetime
 from io import BytesIO
+import json
 import smtplib
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
 import pandas as pd
+from sqlalchemy import Row
 
 from app.core.config import settings
 from app.models.questions import Question
 from app.models.users import User
 
+# Класс ответов со списками вопросов. Ответы ORJSONResponse побайтно
+# совпадают с JSONResponse (компактный JSON, символы не экранируются),
+# но формируются в несколько раз быстрее
+QuestionsJSONResponse: type[JSONResponse] = (
+    ORJSONResponse if settings.orjson_responses else JSONResponse
+)
+
 
 def check_superuser_or_user_who_added(
         question: Question,
@@ -25,6 +40,167 @@ def check_superuser_or_user_who_added(
         )
 
 
+def get_questions_content(
+        questions: Sequence[Mapping[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Преобразует вопросы с полями схемы QuestionDB (записи, выбранные
+    запросом get_question_rows_query, или результаты поиска) в словари
+    без полей со значением None (аналогично параметру
+    response_model_exclude_none). Значения полей уже соответствуют схеме
+    QuestionDB, поэтому повторная валидация не требуется.
+    """
+    return [
+        {field: value for field, value in question.items()
+         if value is not None}
+        for question in questions
+    ]
+
+
+def get_questions_response(
+        questions: Sequence[Mapping[str, Any]],
+        headers: Mapping[str, str] | None = None
+) -> JSONResponse:
+    """
+    Формирует ответ из вопросов с полями схемы QuestionDB, минуя валидацию
+    по response_model.
+    """
+    return QuestionsJSONResponse(
+        get_questions_content(questions), headers=headers
+    )
+
+
+def get_search_headers(
+        next_search_after: list[int | float] | None,
+        stage: str | None = None
+) -> dict[str, str]:
+    """
+    Формирует заголовки ответа с результатами поиска: курсор следующей
+    страницы результатов (X-Next-Cursor) и ступень поиска, давшую
+    результат (X-Search-Stage).
+    """
+    headers = {}
+    if next_search_after is not None:
+        headers['X-Next-Cursor'] = encode_cursor(next_search_after)
+    if stage is not None:
+        headers['X-Search-Stage'] = stage
+    return headers
+
+
+def get_question_rows_response(rows: Sequence[Row]) -> JSONResponse:
+    """
+    Формирует ответ из записей, выбранных запросом get_question_rows_query,
+    минуя валидацию по response_model.
+    """
+    return get_questions_response([row._mapping for row in rows])
+
+
+def get_etag(*parts: Any) -> str:
+    """
+    Формирует строгий ETag из составляющих версии ресурса. Дата и время
+    включаются с точностью до микросекунды.
+    """
+    return '"{}"'.format('-'.join(
+        part.strftime('%Y%m%d%H%M%S%f') if isinstance(part, datetime)
+        else str(part)
+        for part in parts
+    ))
+
+
+def is_modified_since(request: Request, last_modified: datetime) -> bool:
+    """
+    Проверяет, изменился ли ресурс после даты заголовка If-Modified-Since
+    запроса (с точностью до секунды). Некорректная дата не учитывается.
+    """
+    try:
+        since = parsedate_to_datetime(request.headers['If-Modified-Since'])
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) > since
+
+
+def check_not_modified(
+        request: Request,
+        response: Response,
+        etag: str,
+        last_modified: datetime | None = None
+) -> None:
+    """
+    Добавляет в ответ заголовки ETag и Last-Modified. Если у клиента есть
+    текущая версия ресурса (If-None-Match, а при его отсутствии -
+    If-Modified-Since), вызывает исключение 304 без тела ответа.
+    """
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        not_modified = if_none_match.strip() == '*' or etag in {
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+        }
+    elif (
+        last_modified is not None
+        and 'If-Modified-Since' in request.headers
+    ):
+        not_modified = not is_modified_since(request, last_modified)
+    else:
+        not_modified = False
+    if not_modified:
+        raise HTTPException(status_code=304, headers=headers)
+
+
+def encode_cursor(values: list[int | float]) -> str:
+    """
+    Упаковывает ключ сортировки последнего выданного вопроса в курсор
+    следующей страницы результатов.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(
+        cursor: str | None,
+        length: int,
+        stages_quantity: int | None = None
+) -> list[int | float] | None:
+    """
+    Распаковывает курсор, полученный от клиента, в ключ сортировки из length
+    чисел. Последним элементом ключа всегда является первичный ключ вопроса,
+    а если задано количество ступеней поиска stages_quantity - первыми
+    элементами являются номера ступени первой страницы и текущей ступени.
+    Если курсор поврежден - вызывает исключение 400.
+    """
+    if cursor is None:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != length
+        or not all(
+            isinstance(_, (int, float)) and not isinstance(_, bool)
+            for _ in values
+        )
+        or not isinstance(values[-1], int)
+        or stages_quantity is not None and not (
+            isinstance(values[0], int)
+            and isinstance(values[1], int)
+            and 0 <= values[0] <= values[1] < stages_quantity
+        )
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail='Некорректный курсор страницы результатов.'
+        )
+    return values
+
+
 def get_package_questions_list(
         package: list[Question]
 ) -> Tuple[List[dict], str]:
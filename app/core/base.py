@@ -3,5 +3,6 @@
 from app.core.db import Base  # noqa
 from app.models.brain_system import BoughtInProduct, ProductLink, Unit  # noqa
 from app.models.feedback import Feedback  # noqa
-from app.models.questions import Question  # noqa
+from app.models.questions import (Question, QuestionCatalog,  # noqa
+                                  QuestionIndexOutbox)
 from app.models.users import User  # noqa
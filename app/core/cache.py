@@ -0,0 +1,162 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import wraps
+import time
+from typing import Any
+
+from fastapi import Response
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache as redis_cache
+
+import app.core.constants as const
+from app.core.metrics import metrics
+
+
+class LocalCache:
+    """
+    Ограниченный по размеру кэш в памяти процесса с вытеснением давно
+    не использовавшихся записей (LRU) и временем хранения записей.
+    """
+
+    def __init__(self, max_size: int = const.LOCAL_CACHE_SIZE) -> None:
+        self.max_size: int = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Возвращает признак наличия записи и ее значение. Устаревшая запись
+        удаляется.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, expire: float) -> None:
+        """Сохраняет запись на expire секунд."""
+        self._entries[key] = (time.monotonic() + expire, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, *keys: str) -> None:
+        """Удаляет записи."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self._entries.clear()
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вычислений одного значения: пока значение
+    для ключа вычисляется одной корутиной, остальные ожидают ее результата
+    (или исключения), а не повторяют вычисление.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def run(
+            self,
+            key: str,
+            func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            metrics.inc('response_cache_coalesced_total')
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # отменена вычислявшая значение корутина, а не ожидающая
+                if not future.cancelled():
+                    raise
+                return await self.run(key, func)
+        future = asyncio.get_running_loop().create_future()
+        # исключение считается полученным, даже если его никто не ожидал
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception()
+        )
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class CountingRedisBackend(RedisBackend):
+    """Хранилище fastapi-cache в Redis с учетом попаданий в метриках."""
+
+    async def get_with_ttl(self, key: str) -> tuple[int, str | None]:
+        ttl, value = await super().get_with_ttl(key)
+        metrics.inc(
+            f'response_cache_redis_{"misses" if value is None else "hits"}'
+            '_total'
+        )
+        return ttl, value
+
+
+local_response_cache = LocalCache()
+
+response_cache_single_flight = SingleFlight()
+
+
+def cache(
+        expire: int,
+        key_builder: Callable[..., str],
+        local_expire: float = const.LOCAL_CACHING_TIME
+) -> Callable:
+    """
+    Двухуровневое кэширование ответа эндпойнта. Перед обращением к Redis
+    (декоратор cache из fastapi-cache) ответ ищется в кэше процесса, где
+    хранится local_expire секунд уже декодированным. При промахе обоих
+    уровней эндпойнт вызывается для каждого ключа только одной корутиной.
+    Ключ формируется функцией key_builder и должен зависеть только
+    от параметров запроса, определяющих ответ (включая версию ресурса).
+    Заголовки кэширования fastapi-cache (слабый ETag и max-age, равный
+    времени хранения в Redis) клиенту не передаются, поэтому эндпойнт
+    не должен принимать параметр Response.
+    """
+
+    def wrapper(func: Callable) -> Callable:
+        cached_func = redis_cache(
+            expire=expire, key_builder=key_builder
+        )(func)
+
+        @wraps(cached_func)
+        async def inner(*args, **kwargs) -> Any:
+            key = key_builder(func, kwargs=kwargs)
+            is_hit, value = local_response_cache.get(key)
+            metrics.inc(
+                f'response_cache_local_{"hits" if is_hit else "misses"}'
+                '_total'
+            )
+            if is_hit:
+                return value
+            kwargs['response'] = Response()
+            value = await response_cache_single_flight.run(
+                key, lambda: cached_func(*args, **kwargs)
+            )
+            local_response_cache.set(key, value, local_expire)
+            return value
+
+        return inner
+
+    return wrapper
@@ -0,0 +1,86 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Суффикс, добавляемый к ETag ответа, сжатого gzip
+GZIP_ETAG_SUFFIX: str = '-gzip'
+
+
+def get_gzip_etag(etag: str) -> str:
+    """Возвращает ETag сжатого представления ресурса."""
+    if not etag.endswith('"') or etag.endswith(f'{GZIP_ETAG_SUFFIX}"'):
+        return etag
+    return f'{etag[:-1]}{GZIP_ETAG_SUFFIX}"'
+
+
+def remove_gzip_etag_suffix(etag: str) -> str:
+    """Возвращает ETag несжатого представления ресурса."""
+    if etag.endswith(f'{GZIP_ETAG_SUFFIX}"'):
+        return f'{etag[:-len(GZIP_ETAG_SUFFIX) - 1]}"'
+    return etag
+
+
+class ETagGZipResponder(GZipResponder):
+    """
+    Сжатие ответа gzip с отдельным ETag сжатого представления: строгий ETag
+    должен различаться у представлений с разным содержимым, иначе кэш,
+    получивший сжатый ответ, может выдать его клиенту, не принимающему
+    gzip, и наоборот. ETag сжатых представлений в заголовке If-None-Match
+    запроса заменяются ETag несжатых, поэтому приложение сравнивает ETag
+    без учета сжатия, а в ответ 304 возвращается ETag, полученный клиентом.
+    """
+
+    async def __call__(
+            self,
+            scope: Scope,
+            receive: Receive,
+            send: Send
+    ) -> None:
+        self.gzip_etag_requested = False
+        if_none_match = Headers(scope=scope).get('If-None-Match')
+        if if_none_match is not None:
+            etags = [etag.strip() for etag in if_none_match.split(',')]
+            self.gzip_etag_requested = any(
+                etag != remove_gzip_etag_suffix(etag) for etag in etags
+            )
+            MutableHeaders(scope=scope)['If-None-Match'] = ', '.join(
+                remove_gzip_etag_suffix(etag) for etag in etags
+            )
+
+        async def send_with_etag(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(raw=message['headers'])
+                etag = headers.get('ETag')
+                is_compressed = (
+                    not self.content_encoding_set
+                    and headers.get('Content-Encoding') == 'gzip'
+                )
+                if etag is not None and (
+                    is_compressed
+                    or message['status'] == 304 and self.gzip_etag_requested
+                ):
+                    headers['ETag'] = get_gzip_etag(etag)
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_etag)
+
+
+class ETagGZipMiddleware(GZipMiddleware):
+    """Сжатие ответов gzip с отдельным ETag (см. ETagGZipResponder)."""
+
+    async def __call__(
+            self,
+            scope: Scope,
+            receive: Receive,
+            send: Send
+    ) -> None:
+        if scope['type'] == 'http':
+            headers = Headers(scope=scope)
+            if 'gzip' in headers.get('Accept-Encoding', ''):
+                responder = ETagGZipResponder(
+                    self.app, self.minimum_size,
+                    compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
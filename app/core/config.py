@@ -1,12 +1,5 @@
-from contextlib import asynccontextmanager
-from collections.abc import AsyncIterator
-
-from fastapi import FastAPI
 from fastapi.templating import Jinja2Templates
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from redis import asyncio as aioredis
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -41,6 +34,14 @@ class Settings(BaseSettings):
     smtp_host_user: str
     elasticsearch_host: str
     elasticsearch_port: str
+    search_backend: str = 'elasticsearch'
+    # Сериализация списков вопросов в JSON библиотекой orjson
+    orjson_responses: bool = False
+
+    @property
+    def redis_url(self) -> str:
+        return (f'redis://:{self.redis_password}@{self.redis_host}'
+                f':{self.redis_port}')
 
 
 settings = Settings()
@@ -48,13 +49,3 @@ settings = Settings()
 templates = Jinja2Templates(directory=settings.templates_dir)
 
 limiter = Limiter(key_func=get_remote_address)
-
-
-@asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    redis = aioredis.from_url((
-        f'redis://:{settings.redis_password}@{settings.redis_host}'
-        f':{settings.redis_port}'
-    ))
-    FastAPICache.init(RedisBackend(redis), prefix='fastapi-cache')
-    yield
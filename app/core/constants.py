@@ -12,12 +12,115 @@ DEFAULT_QUESTIONS_QUANTITY: int = 10
 # Минимальное количество символов, по которым возможен посик вопросов в БД
 MIN_SEARCH_PATTERN_LENGTH: int = 3
 
-# Размер первоначальной выборки при выдаче случайного пакета вопросов
-SET_FOR_RANDOMIZING: int = 5000
+# Минимальная длина начала текста, для которого выдаются подсказки
+MIN_SUGGEST_PREFIX_LENGTH: int = 3
+
+# Количество подсказок по умолчанию и максимальное количество подсказок
+DEFAULT_SUGGESTIONS_QUANTITY: int = 5
+MAX_SUGGESTIONS_QUANTITY: int = 10
+
+# Поля вопроса, по которым подсчитываются фасеты полнотекстового поиска
+# (количество найденных вопросов по значениям поля)
+QUESTION_FACET_FIELDS: tuple[str, ...] = (
+    'question_type', 'package', 'authors'
+)
+
+# Максимальное количество значений в каждом фасете
+QUESTION_FACET_SIZE: int = 10
+
+# Максимальная длина фрагмента текста вопроса в подсказке
+QUESTION_SNIPPET_LENGTH: int = 100
 
 # Интервал времени между обновлениями количества вопросов в базе
 REFRESH_INTERVAL: timedelta = timedelta(hours=24)
 
+# Время жизни блокировки, удерживаемой процессом, пересчитывающим
+# общие для всех процессов счетчики вопросов (в секундах)
+QUESTION_COUNTERS_LOCK_TIMEOUT: int = 30
+
+# Максимальное количество первичных ключей, хранимых в памяти процесса
+# для выбора случайных вопросов (ограничивает расход памяти индексом)
+QUESTION_ID_INDEX_MAX_SIZE: int = 2_000_000
+
+# Количество первичных ключей, загружаемых из БД за один запрос
+# при построении индекса
+QUESTION_ID_INDEX_CHUNK_SIZE: int = 10_000
+
+# Интервал времени между догрузками в индекс новых вопросов
+QUESTION_ID_INDEX_REFRESH_INTERVAL: timedelta = timedelta(minutes=1)
+
+# Запас времени при выборке вопросов, измененных после обновления индекса:
+# учитывает транзакции, зафиксированные позже изменения вопроса, и разницу
+# часов процессов
+QUESTION_ID_INDEX_UPDATE_LAG: timedelta = timedelta(minutes=1)
+
+# Количество попыток добрать недостающие вопросы при выборке из индекса
+QUESTION_ID_INDEX_SAMPLING_ATTEMPTS: int = 3
+
+# Типы вопросов, для которых в Redis поддерживаются
+# предварительно перемешанные пулы случайных вопросов
+QUESTION_POOL_TYPES: tuple[str, ...] = ('Ч', 'Б', 'Я')
+
+# Количество вопросов в пуле, ниже которого пул пополняется
+QUESTION_POOL_LOW_WATER_MARK: int = 1000
+
+# Количество вопросов, добавляемых в пул за одно пополнение
+QUESTION_POOL_REFILL_SIZE: int = 5000
+
+# Количество повторных выборок по случайному ключу взамен повторившихся
+# вопросов, после которых выборка дополняется оставшимися вопросами
+RANDOM_KEY_SEEK_ROUNDS: int = 3
+
+# Интервал времени между проверками заполненности пулов
+QUESTION_POOL_REFILL_INTERVAL: timedelta = timedelta(seconds=10)
+
+# Время ожидания ответа Elasticsearch при обработке запросов (в секундах)
+ELASTICSEARCH_REQUEST_TIMEOUT: int = 5
+
+# Количество повторных обращений к Elasticsearch при ошибке соединения
+ELASTICSEARCH_MAX_RETRIES: int = 2
+
+# Размер пула соединений с узлом Elasticsearch
+ELASTICSEARCH_CONNECTIONS_PER_NODE: int = 25
+
+# Предельное время выполнения обращения к Elasticsearch при обработке
+# запроса с учетом повторных обращений (в секундах)
+ELASTICSEARCH_CALL_DEADLINE: float = 2.0
+
+# Количество ошибок обращения к Elasticsearch подряд, после которого
+# обращения прекращаются (размыкается предохранитель)
+ELASTICSEARCH_BREAKER_FAILURE_THRESHOLD: int = 5
+
+# Время, по истечении которого после размыкания предохранителя выполняется
+# пробное обращение к Elasticsearch
+ELASTICSEARCH_BREAKER_RESET_TIMEOUT: timedelta = timedelta(seconds=30)
+
+# Количество изменений вопросов, переносимых в поисковый индекс
+# за один запрос к bulk API
+QUESTION_INDEX_OUTBOX_BATCH_SIZE: int = 500
+
+# Интервал времени между переносами изменений вопросов в поисковый индекс
+QUESTION_INDEX_OUTBOX_DRAIN_INTERVAL: timedelta = timedelta(seconds=5)
+
+# Количество повторных попыток переноса изменений при ошибке Elasticsearch
+QUESTION_INDEX_OUTBOX_MAX_RETRIES: int = 3
+
+# Количество вопросов, выбираемых из БД и отправляемых в bulk API
+# за одну итерацию при переиндексации
+QUESTION_REINDEX_CHUNK_SIZE: int = 1000
+
+# Количество потоков, отправляющих данные в bulk API при переиндексации
+QUESTION_REINDEX_THREAD_COUNT: int = 4
+
+# Количество загруженных документов, после которого сохраняется
+# прогресс переиндексации
+QUESTION_REINDEX_CHECKPOINT_INTERVAL: int = 10_000
+
+# Время хранения сведений об удаленных документах (tombstone) в индексе,
+# в который выполняется переиндексация: пока они хранятся, загрузка
+# прочитанного ранее из БД вопроса не восстанавливает удаленный документ
+QUESTION_REINDEX_GC_DELETES: str = '7d'
+
 # Максимальная длина текста сообщения в обратной связи
 MAX_FEEDBACK_LENGTH: int = 5000
 
@@ -41,5 +144,34 @@ EXPORT_MODEL_TO_ODS_THROTTLING_RATE: str = '2/minute'
 # к страницам выдачи вопросов
 GENERATE_QUESTIONS_THROTTLING_RATE: str = '5/minute'
 
+# Ограничения количества запросов в единицу времени к подсказкам
+# при наборе текста поиска
+SUGGEST_THROTTLING_RATE: str = '120/minute'
+
 # Время кэширования страниц по умолчанию (в секундах)
 DEFAULT_CACHING_TIME: int = 60 * 5
+
+# Время хранения ответов эндпойнтов с вопросами (в секундах). Ключи ответов
+# включают версию вопросов, поэтому устаревшие ответы не выдаются
+QUESTION_CACHING_TIME: int = 60 * 60 * 12
+
+# Время хранения ответов эндпойнтов в кэше процесса (в секундах)
+LOCAL_CACHING_TIME: float = 5
+
+# Максимальное количество ответов эндпойнтов в кэше процесса
+LOCAL_CACHE_SIZE: int = 1024
+
+# Время хранения результатов поиска вопросов (в секундах). Результаты
+# перестают использоваться раньше - при любом изменении вопросов
+SEARCH_CACHING_TIME: int = 60 * 60
+
+# Время хранения подсказок при наборе текста поиска (в секундах)
+SUGGEST_CACHING_TIME: int = 60
+
+# Минимальный размер ответа (в байтах), который сжимается gzip
+GZIP_MINIMUM_SIZE: int = 1000
+
+# Степень сжатия ответов gzip. Ответы сжимаются при каждом запросе, поэтому
+# используется средняя степень: текст вопросов сжимается почти так же,
+# как при максимальной, но примерно вдвое быстрее
+GZIP_COMPRESS_LEVEL: int = 5
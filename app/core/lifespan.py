@@ -0,0 +1,26 @@
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi_cache import FastAPICache
+
+from app.core.cache import CountingRedisBackend
+from app.core.db import async_session_factory
+from app.core.redis import redis_client
+from app.crud.questions_counters import get_question_counters
+from app.crud.questions_index import question_id_index
+from app.crud.questions_response_cache import RESPONSE_CACHE_PREFIX
+from app.search.dependencies import create_search_backend
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    FastAPICache.init(
+        CountingRedisBackend(redis_client), prefix=RESPONSE_CACHE_PREFIX
+    )
+    app.state.search_backend = create_search_backend()
+    async with async_session_factory() as session:
+        question_counters = await get_question_counters(session)
+        await question_id_index.refresh(session, question_counters['total'])
+    yield
+    await app.state.search_backend.close()
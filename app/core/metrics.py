@@ -0,0 +1,34 @@
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса приложения: монотонно возрастающие счетчики и
+    мгновенные значения (размеры, длительности операций и т.п.).
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Увеличивает значение счетчика."""
+        self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        """Возвращает текущее значение счетчика."""
+        return self._counters.get(name, 0)
+
+    def set(self, name: str, value: float) -> None:
+        """Устанавливает мгновенное значение метрики."""
+        self._gauges[name] = value
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Возвращает текущие значения всех метрик."""
+        return {
+            'counters': dict(self._counters),
+            'gauges': dict(self._gauges),
+        }
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,5 @@
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+
+redis_client: aioredis.Redis = aioredis.from_url(settings.redis_url)
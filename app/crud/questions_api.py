@@ -3,86 +3,120 @@ import random
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import Select, false, func, select, true
+from sqlalchemy import Row, Select, false, func, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.constants import REFRESH_INTERVAL, SET_FOR_RANDOMIZING
+import app.core.constants as const
 from app.core.db import sync_session_factory
-from app.models.questions import Question
+from app.crud.questions_catalog import (get_catalog_key,
+                                        get_random_catalog_package,
+                                        refresh_question_catalog)
+from app.crud.questions_counters import (get_counter_state,
+                                         get_question_counters,
+                                         update_question_counters)
+from app.crud.questions_index import question_id_index
+from app.crud.questions_outbox import add_question_index_outbox_record
+from app.crud.questions_pool import get_pooled_questions, merge_questions
+from app.crud.questions_random_key import (get_first_by_random_key_query,
+                                           get_random_key_seek_queries)
+from app.crud.questions_search_cache import bump_question_corpus_version
+from app.models.questions import Question, QuestionType
 from app.models.users import User
-from app.schemas.questions import QuestionCreate
-
-max_sets: dict[str, int | None] = {
-    'Б': None,
-    'ДБ': None,
-    'И': None,
-    'Л': None,
-    'Ч': None,
-    'ЧБ': None,
-    'ЧД': None,
-    'Э': None,
-    'Я': None,
-    'total': None
-}
-
-LAST_REFRESH: datetime = datetime.now(timezone.utc)
-
-
-async def get_max_question_type_quantity(
-        session: AsyncSession
-) -> dict[str, int | None]:
-    """Пересчитывает количество вопросов в БД по категориям вопросов через
-    заданный в параметре REFRESH_INTERVAL интервал времени."""
-    global max_sets, LAST_REFRESH
-    if (
-        not all(max_sets.values())
-        or (datetime.now(timezone.utc) - LAST_REFRESH > REFRESH_INTERVAL)
-    ):
-        query = (
-            select(Question.question_type, func.count())
-            .select_from(Question)
-            .filter(
-                Question.is_condemned == false(),
-                Question.is_published == true()
-            )
-            .group_by(Question.question_type)
-        )
-        qunatities = await session.execute(query)
-        for counted_question_type in qunatities.all():
-            max_sets[counted_question_type[0].name] = counted_question_type[1]
-        total_quantity = await session.execute(
-            select(func.count()).select_from(Question)
-        )
-        max_sets['total'] = total_quantity.scalars().first()
-        LAST_REFRESH = datetime.now(timezone.utc)
-    return max_sets
+from app.schemas.questions import QuestionCreate, QuestionDB
+
+
+def get_question_rows_query() -> Select:
+    """
+    Формирует запрос, выбирающий только поля схемы QuestionDB. Записи
+    возвращаются в виде кортежей Row без создания объектов модели.
+    """
+    return select(*(
+        getattr(Question, field) for field in QuestionDB.model_fields
+    ))
 
 
-async def get_initial_query(
+async def get_random_rows_by_key(
         session: AsyncSession,
-        question_type: str | None
-) -> Select[tuple[Question]]:
-    """Формирует первоначальный список вопросов с учетом типа вопроса и
-    заданного константой "SET_FOR_RANDOMIZING" размера выборки.
-    Функция необходима для ускорения запросов к БД."""
-    max_question_type_dict = await get_max_question_type_quantity(session)
-    max_question_type_quantity = max_question_type_dict['total']
-    query = select(Question).filter(
+        query: Select,
+        quantity: int
+) -> list[Row]:
+    """
+    Выбирает записи независимыми поисками по случайному ключу (см.
+    get_random_key_seek_queries): каждая запись выбирается по своей
+    случайной точке диапазона [0, 1), поэтому выборка не является
+    непрерывным отрезком порядка случайных ключей. Повторившиеся записи
+    выбираются заново, а если после RANDOM_KEY_SEEK_ROUNDS попыток записей
+    все еще не хватает (запрошена большая часть записей) - выборка
+    дополняется оставшимися записями. Запрос должен содержать фильтры
+    по статусу и типу вопроса, чтобы выборка выполнялась поиском
+    по частичному индексу.
+    """
+    id_query = query.with_only_columns(Question.id)
+    pk_list: dict[int, None] = {}
+    for _ in range(const.RANDOM_KEY_SEEK_ROUNDS):
+        missing = quantity - len(pk_list)
+        if not missing:
+            break
+        found = []
+        for seek_query in get_random_key_seek_queries(id_query, missing):
+            found.extend((await session.scalars(seek_query)).all())
+        if len(found) < missing:
+            found.extend((await session.scalars(
+                get_first_by_random_key_query(id_query)
+            )).all())
+        if not found:
+            return []
+        pk_list.update(dict.fromkeys(found))
+    missing = quantity - len(pk_list)
+    if missing > 0:
+        pk_list.update(dict.fromkeys((await session.scalars(
+            id_query.filter(Question.id.not_in(pk_list)).limit(missing)
+        )).all()))
+    rows = await session.execute(
+        query.filter(Question.id.in_(list(pk_list)[:quantity]))
+    )
+    rows = rows.all()
+    random.shuffle(rows)
+    return rows
+
+
+async def get_random_questions(
+        session: AsyncSession,
+        question_type: str | None,
+        quantity: int
+) -> list[Row]:
+    """
+    Возвращает набор случайных вопросов с учетом типа вопроса. Ключи
+    вопросов извлекаются из пула в Redis, а при его исчерпании - выбираются
+    из индекса в памяти процесса; из БД загружаются только выбранные записи.
+    Если индекс не может быть использован - вопросы выбираются по случайному
+    ключу (см. get_random_rows_by_key).
+    """
+    query = get_question_rows_query().filter(
         Question.is_condemned == false(),
         Question.is_published == true()
     )
-    if question_type:
-        query = query.filter(Question.question_type == question_type)
-        max_question_type_quantity = max_question_type_dict[question_type]
-    if max_question_type_quantity <= SET_FOR_RANDOMIZING:
-        start_point = 0
-    else:
-        start_point = random.randint(
-            0,
-            max_question_type_quantity - SET_FOR_RANDOMIZING - 1
+
+    async def fetch(pk_list: list[int]) -> list[Row]:
+        questions = await session.execute(
+            query.filter(Question.id.in_(pk_list))
         )
-    query = query.offset(start_point).limit(SET_FOR_RANDOMIZING)
-    return query
+        return questions.all()
+
+    pooled_questions = await get_pooled_questions(
+        question_type, quantity, fetch
+    )
+    if len(pooled_questions) == quantity:
+        return pooled_questions
+    question_counters = await get_question_counters(session)
+    questions = await question_id_index.get_random_questions(
+        session, question_type, quantity, fetch, question_counters['total']
+    )
+    if questions is None:
+        if question_type:
+            query = query.filter(Question.question_type == question_type)
+        questions = await get_random_rows_by_key(session, query, quantity)
+    return merge_questions(pooled_questions, questions, quantity)
 
 
 async def get_valid_question_or_404(
@@ -131,23 +165,61 @@ async def get_question_or_404(
     return question
 
 
-async def get_random_package(session: AsyncSession) -> list[Question]:
+async def get_question_version(
+        question_id: int,
+        session: AsyncSession,
+) -> Row | None:
+    """
+    Возвращает версию и время изменения вопроса, если вопрос найден в Базе
+    и разрешен к выдаче. Запрос выполняется по индексу ix_question_id_version
+    без чтения записи вопроса.
+    """
+    version = await session.execute(
+        select(Question.version, Question.updated_at).filter(
+            Question.id == question_id,
+            Question.is_condemned == false(),
+            Question.is_published == true()
+        )
+    )
+    return version.first()
+
+
+async def get_user_questions_version(
+        user_id: int,
+        session: AsyncSession,
+) -> Row:
+    """
+    Возвращает количество вопросов, добавленных пользователем, наибольший
+    id, сумму версий и наибольшее время изменения этих вопросов - сводную
+    версию списка вопросов, которая изменяется при добавлении, изменении
+    и удалении любого из них (в том числе при повторном использовании id
+    удаленного вопроса в SQLite). Запрос выполняется по индексу
+    ix_question_user_id_version.
+    """
+    version = await session.execute(
+        select(
+            func.count(),
+            func.max(Question.id),
+            func.sum(Question.version),
+            func.max(Question.updated_at)
+        ).filter(Question.user_id == user_id)
+    )
+    return version.one()
+
+
+async def get_random_package(session: AsyncSession) -> list[Row]:
     """
     Возвращает список всех вопросов, относящихся к одному случайно
     выбранному пакету.
     """
-    random_package = await session.execute(
-        select(Question.package)
-        .group_by(Question.package)
-        .order_by(func.random())
-        .limit(1)
-    )
-    random_package = random_package.scalar_one()
+    random_package = await get_random_catalog_package(session)
+    if random_package is None:
+        return []
     package_set = await session.execute(
-        select(Question)
+        get_question_rows_query()
         .filter(Question.package == random_package)
     )
-    return package_set.scalars().all()
+    return package_set.all()
 
 
 async def create_question(
@@ -160,8 +232,14 @@ async def create_question(
     question_data['user_id'] = user.id
     question_obj = Question(**question_data)
     session.add(question_obj)
+    await session.flush()
+    await refresh_question_catalog(session, [get_catalog_key(question_obj)])
+    add_question_index_outbox_record(session, question_obj.id)
     await session.commit()
     await session.refresh(question_obj)
+    question_id_index.update(question_obj)
+    await update_question_counters(None, get_counter_state(question_obj))
+    await bump_question_corpus_version()
     return question_obj
 
 
@@ -172,6 +250,8 @@ async def edit_question(
     session: AsyncSession,
 ) -> Question:
     """Модифицирует вопрос в Базе."""
+    initial_catalog_key = get_catalog_key(question)
+    initial_counter_state = get_counter_state(question)
     initial_data = jsonable_encoder(question)
     update_data = update_data.model_dump(exclude_unset=True)
     for field in initial_data:
@@ -187,12 +267,41 @@ async def edit_question(
                 'is_published',
                 False
             )
+    question.version = Question.version + 1
+    question.updated_at = datetime.now(timezone.utc)
     session.add(question)
+    await session.flush()
+    await refresh_question_catalog(
+        session, [initial_catalog_key, get_catalog_key(question)]
+    )
+    add_question_index_outbox_record(session, question.id)
     await session.commit()
     await session.refresh(question)
+    question_id_index.update(question)
+    await update_question_counters(
+        initial_counter_state, get_counter_state(question)
+    )
+    await bump_question_corpus_version()
     return question
 
 
+async def delete_question_from_db(
+    question: Question,
+    session: AsyncSession,
+) -> None:
+    """Удаляет вопрос из Базы."""
+    initial_counter_state = get_counter_state(question)
+    question_id = question.id
+    await session.delete(question)
+    await session.flush()
+    await refresh_question_catalog(session, [get_catalog_key(question)])
+    add_question_index_outbox_record(session, question.id)
+    await session.commit()
+    question_id_index.discard(question_id)
+    await update_question_counters(initial_counter_state, None)
+    await bump_question_corpus_version()
+
+
 def get_unpublished_questions_num() -> int:
     """
     Возвращает количесвто неопубликованных вопросов.
@@ -204,17 +313,56 @@ def get_unpublished_questions_num() -> int:
     return questions_num.scalars().first()
 
 
+async def get_questions_by_substring(
+        session: AsyncSession,
+        search_pattern: str,
+        quantity: int,
+        question_type: str | None = None,
+        after_id: int | None = None,
+        filters: dict[str, str] | None = None,
+        random_order: bool = False
+) -> list[Row]:
+    """
+    Возвращает вопросы, разрешенные к выдаче, текст которых содержит
+    подстроку (без учета регистра), по возрастанию первичного ключа,
+    начиная с вопроса, следующего за after_id. Тип вопроса передается
+    в виде полного названия (значения QuestionType), filters - точные
+    значения прочих полей вопроса. Если random_order - возвращается
+    случайная выборка из всех найденных вопросов.
+    """
+    query = get_question_rows_query().filter(
+        Question.is_condemned == false(),
+        Question.is_published == true(),
+        Question.question.icontains(search_pattern)
+    )
+    if question_type:
+        query = query.filter(
+            Question.question_type == QuestionType(question_type)
+        )
+    query = query.filter(*(
+        getattr(Question, field) == value
+        for field, value in (filters or {}).items()
+    ))
+    if after_id is not None:
+        query = query.filter(Question.id > after_id)
+    questions = await session.execute(
+        query.order_by(func.random() if random_order else Question.id)
+        .limit(quantity)
+    )
+    return questions.all()
+
+
 async def get_questions_by_list_order(
         pk_list: list[int],
         session: AsyncSession,
-) -> list[Question]:
+) -> list[Row]:
     """
     Получает набор вопросов, соответствующий переданному списку первичных
     ключей, и сортирует этот набор согласно порядку следования ключей в списке.
     """
     questions = await session.execute(
-        select(Question)
+        get_question_rows_query()
         .where(Question.id.in_(pk_list))
     )
-    questions = questions.scalars().all()
-    return [next(_ for _ in questions if _.id == pk) for pk in pk_list]
+    questions = {question.id: question for question in questions.all()}
+    return [questions[pk] for pk in pk_list if pk in questions]
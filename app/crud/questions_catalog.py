@@ -0,0 +1,136 @@
+from collections.abc import Iterable
+
+from sqlalchemy import (ColumnElement, Delete, Insert, and_, delete, distinct,
+                        false, func, or_, select, true)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.questions import (Question, QuestionCatalog,
+                                  QuestionCatalogKeyIndex, QuestionType)
+
+CatalogKey = tuple[str | None, QuestionType]
+
+
+def get_catalog_key(question: Question) -> CatalogKey:
+    """Возвращает ключ записи каталога, к которой относится вопрос."""
+    return question.package, question.question_type
+
+
+def get_catalog_keys_clause(
+        model: type[Question] | type[QuestionCatalog],
+        keys: Iterable[CatalogKey]
+) -> ColumnElement[bool]:
+    """Формирует условие отбора записей по парам (пакет, тип вопроса)."""
+    return or_(*(
+        and_(model.package == package, model.question_type == question_type)
+        for package, question_type in keys
+    ))
+
+
+def get_catalog_refresh_statements(
+        keys: Iterable[CatalogKey] | None = None
+) -> tuple[Delete, Insert]:
+    """
+    Формирует запросы пересчета записей каталога для переданных пар
+    (пакет, тип вопроса) или, если пары не переданы, всего каталога.
+    Записи вставляются с обновлением при конфликте по уникальному индексу
+    пар: если одновременные транзакции пересчитывают одну пару, запись,
+    вставленная первой из них, обновляется второй, а не дублируется.
+    """
+    aggregate = (
+        select(
+            Question.package,
+            Question.question_type,
+            func.count(),
+            func.count(distinct(Question.tour)),
+            func.min(Question.id),
+            func.max(Question.id),
+        )
+        .filter(
+            Question.is_condemned == false(),
+            Question.is_published == true()
+        )
+        .group_by(Question.package, Question.question_type)
+    )
+    remove = delete(QuestionCatalog)
+    if keys is not None:
+        keys = set(keys)
+        aggregate = aggregate.filter(get_catalog_keys_clause(Question, keys))
+        remove = remove.where(get_catalog_keys_clause(QuestionCatalog, keys))
+    dialect = postgresql if settings.database_type == 'postgres' else sqlite
+    upsert = dialect.insert(QuestionCatalog).from_select(
+        [
+            'package',
+            'question_type',
+            'question_count',
+            'tour_count',
+            'min_question_id',
+            'max_question_id',
+        ],
+        aggregate
+    )
+    return remove, upsert.on_conflict_do_update(
+        index_elements=list(QuestionCatalogKeyIndex.expressions),
+        set_={
+            field: upsert.excluded[field]
+            for field in (
+                'question_count',
+                'tour_count',
+                'min_question_id',
+                'max_question_id',
+            )
+        }
+    )
+
+
+async def refresh_question_catalog(
+        session: AsyncSession,
+        keys: Iterable[CatalogKey] | None = None
+) -> None:
+    """
+    Пересчитывает записи каталога в рамках текущей транзакции. Изменения
+    вопросов должны быть предварительно переданы в БД (flush).
+    """
+    for statement in get_catalog_refresh_statements(keys):
+        await session.execute(statement)
+
+
+async def get_random_catalog_package(
+        session: AsyncSession,
+        question_type: str | None = None
+) -> str | None:
+    """
+    Возвращает название случайного пакета, содержащего вопросы заданного
+    типа (или вопросы любых типов). Если каталог пуст - возвращает None.
+    """
+    query = select(QuestionCatalog.package).filter(
+        QuestionCatalog.package.is_not(None)
+    )
+    if question_type:
+        query = query.filter(QuestionCatalog.question_type == question_type)
+    random_package = await session.execute(
+        query.group_by(QuestionCatalog.package)
+        .order_by(func.random())
+        .limit(1)
+    )
+    return random_package.scalar()
+
+
+async def get_catalog_question_type_quantity(
+        session: AsyncSession
+) -> dict[str, int]:
+    """
+    Возвращает количество вопросов, разрешенных к выдаче, по типам вопросов.
+    """
+    quantities = await session.execute(
+        select(
+            QuestionCatalog.question_type,
+            func.sum(QuestionCatalog.question_count)
+        )
+        .group_by(QuestionCatalog.question_type)
+    )
+    return {
+        question_type.name: quantity
+        for question_type, quantity in quantities.all()
+    }
@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+import uuid
+
+from redis import RedisError, WatchError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.core.redis import redis_client
+from app.crud.questions_catalog import get_catalog_question_type_quantity
+from app.models.questions import Question, QuestionType
+
+# Ключ хеша Redis со счетчиками вопросов, общими для всех процессов
+QUESTION_COUNTERS_KEY: str = 'question-counters'
+
+# Ключ блокировки, удерживаемой процессом, пересчитывающим счетчики
+QUESTION_COUNTERS_LOCK_KEY: str = 'question-counters:lock'
+
+# Сценарий Lua, снимающий блокировку, только если она удерживается
+# процессом с переданным маркером (блокировка могла истечь и быть получена
+# другим процессом)
+RELEASE_LOCK_SCRIPT: str = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def get_counter_state(question: Question) -> str | None:
+    """
+    Возвращает категорию, в счетчике которой учитывается вопрос, либо None,
+    если вопрос не разрешен к выдаче.
+    """
+    if question.is_published and not question.is_condemned:
+        return question.question_type.name
+    return None
+
+
+async def count_questions(session: AsyncSession) -> dict[str, int]:
+    """
+    Подсчитывает по каталогу вопросов количество вопросов, разрешенных
+    к выдаче, по категориям вопросов и в целом.
+    """
+    quantities = await get_catalog_question_type_quantity(session)
+    counters = {
+        question_type.name: quantities.get(question_type.name, 0)
+        for question_type in QuestionType
+    }
+    counters['total'] = sum(quantities.values())
+    return counters
+
+
+async def get_question_counters(session: AsyncSession) -> dict[str, int]:
+    """
+    Возвращает количество вопросов, разрешенных к выдаче, из общего для всех
+    процессов хранилища счетчиков в Redis. По истечении REFRESH_INTERVAL
+    счетчики пересчитывает только один процесс, получивший блокировку,
+    остальные до окончания пересчета используют прежние значения.
+    Пересчитанные значения сохраняются, только если во время пересчета
+    счетчики не изменялись (WATCH): иначе изменения были бы потеряны,
+    и пересчет повторяется при следующем обращении.
+    При недоступности Redis счетчики подсчитываются по каталогу вопросов.
+    """
+    try:
+        counters = await redis_client.hgetall(QUESTION_COUNTERS_KEY)
+    except RedisError:
+        metrics.inc('question_counters_redis_errors_total')
+        return await count_questions(session)
+    counters = {
+        name.decode(): float(value) for name, value in counters.items()
+    }
+    refreshed_at = counters.pop('refreshed_at', None)
+    counters = {name: int(value) for name, value in counters.items()}
+    now = datetime.now(timezone.utc).timestamp()
+    if (
+        refreshed_at is not None
+        and now - refreshed_at < const.REFRESH_INTERVAL.total_seconds()
+    ):
+        return counters
+    lock_token = uuid.uuid4().hex
+    try:
+        is_locked = await redis_client.set(
+            QUESTION_COUNTERS_LOCK_KEY,
+            lock_token,
+            nx=True,
+            ex=const.QUESTION_COUNTERS_LOCK_TIMEOUT
+        )
+    except RedisError:
+        is_locked = False
+    if not is_locked:
+        if refreshed_at is not None:
+            return counters
+        return await count_questions(session)
+    counters = None
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            await pipe.watch(QUESTION_COUNTERS_KEY)
+            counters = await count_questions(session)
+            pipe.multi()
+            pipe.delete(QUESTION_COUNTERS_KEY)
+            pipe.hset(
+                QUESTION_COUNTERS_KEY,
+                mapping={**counters, 'refreshed_at': now}
+            )
+            await pipe.execute()
+        metrics.inc('question_counters_refreshes_total')
+    except WatchError:
+        metrics.inc('question_counters_refresh_conflicts_total')
+    except RedisError:
+        metrics.inc('question_counters_redis_errors_total')
+    try:
+        await redis_client.eval(
+            RELEASE_LOCK_SCRIPT, 1, QUESTION_COUNTERS_LOCK_KEY, lock_token
+        )
+    except RedisError:
+        metrics.inc('question_counters_redis_errors_total')
+    if counters is None:
+        counters = await count_questions(session)
+    return counters
+
+
+async def update_question_counters(
+        initial_state: str | None,
+        state: str | None
+) -> None:
+    """
+    Изменяет счетчики вопросов после изменения вопроса. Если счетчики еще
+    не подсчитаны - ничего не делает: они будут подсчитаны при следующем
+    обращении.
+    """
+    deltas = defaultdict(int)
+    if initial_state is not None:
+        deltas[initial_state] -= 1
+        deltas['total'] -= 1
+    if state is not None:
+        deltas[state] += 1
+        deltas['total'] += 1
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    try:
+        if not await redis_client.exists(QUESTION_COUNTERS_KEY):
+            return
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for name, delta in deltas.items():
+                pipe.hincrby(QUESTION_COUNTERS_KEY, name, delta)
+            await pipe.execute()
+    except RedisError:
+        metrics.inc('question_counters_redis_errors_total')
@@ -0,0 +1,290 @@
+from array import array
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timezone
+import random
+import time
+from typing import Any
+
+from sqlalchemy import Row, false, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.models.questions import Question
+
+# Тип элементов массива: беззнаковое целое размером 4 байта
+ID_TYPECODE: str = 'I'
+
+
+class QuestionIdIndex:
+    """
+    Хранимый в памяти процесса индекс первичных ключей вопросов, разрешенных
+    к выдаче, с разбивкой по типам вопросов. Позволяет выбирать случайные
+    вопросы без сканирования таблицы: из индекса выбирается ровно
+    необходимое количество ключей, после чего из БД загружаются только
+    соответствующие им записи.
+    """
+
+    def __init__(
+            self,
+            max_size: int = const.QUESTION_ID_INDEX_MAX_SIZE,
+            chunk_size: int = const.QUESTION_ID_INDEX_CHUNK_SIZE,
+    ) -> None:
+        self.max_size: int = max_size
+        self.chunk_size: int = chunk_size
+        self.is_overflowed: bool = False
+        self._ids: dict[str, array] = {}
+        self._last_id: int = 0
+        self._built_at: datetime | None = None
+        self._refreshed_at: datetime | None = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(_) for _ in self._ids.values())
+
+    @property
+    def memory_size(self) -> int:
+        """Объем памяти, занимаемый массивами ключей (в байтах)."""
+        return sum(_.buffer_info()[1] * _.itemsize for _ in self._ids.values())
+
+    def _get_refresh_mode(self) -> str | None:
+        """
+        Определяет необходимость обновления индекса: полное перестроение
+        после истечения REFRESH_INTERVAL, загрузка изменений после
+        истечения QUESTION_ID_INDEX_REFRESH_INTERVAL.
+        """
+        now = datetime.now(timezone.utc)
+        if (
+            self._built_at is None
+            or now - self._built_at > const.REFRESH_INTERVAL
+        ):
+            return 'full'
+        if self.is_overflowed:
+            return None
+        if now - self._refreshed_at > const.QUESTION_ID_INDEX_REFRESH_INTERVAL:
+            return 'incremental'
+        return None
+
+    async def refresh(
+            self,
+            session: AsyncSession,
+            expected_size: int | None = None
+    ) -> None:
+        """
+        Строит индекс или загружает в него изменения из БД. Индекс
+        перестраивается в новые массивы, которые заменяют прежние после
+        завершения загрузки; пока индекс обновляется одной корутиной,
+        остальные выбирают ключи из прежнего индекса, не ожидая обновления.
+        Если известное заранее количество вопросов, разрешенных к выдаче,
+        превышает QUESTION_ID_INDEX_MAX_SIZE - индекс не строится.
+        """
+        if self._get_refresh_mode() is None:
+            return
+        if self._lock.locked() and self._built_at is not None:
+            return
+        async with self._lock:
+            mode = self._get_refresh_mode()
+            if mode is None:
+                return
+            start = time.perf_counter()
+            # изменения, выполненные во время обновления, загружаются
+            # следующим обновлением
+            started_at = datetime.now(timezone.utc)
+            if mode == 'full':
+                await self._rebuild(session, expected_size)
+                self._built_at = started_at
+            else:
+                await self._load_changes(
+                    session,
+                    self._refreshed_at - const.QUESTION_ID_INDEX_UPDATE_LAG
+                )
+                last_id = await self._load(session, self._ids, self._last_id)
+                if last_id is None:
+                    self._ids, self.is_overflowed = {}, True
+                else:
+                    self._last_id = last_id
+            self._refreshed_at = started_at
+            metrics.set(
+                f'question_id_index_{mode}_refresh_seconds',
+                time.perf_counter() - start
+            )
+            self._update_metrics()
+
+    async def _rebuild(
+            self,
+            session: AsyncSession,
+            expected_size: int | None
+    ) -> None:
+        """Строит индекс заново и заменяет им прежний."""
+        ids: dict[str, array] = {}
+        last_id = 0
+        is_overflowed = (
+            expected_size is not None and expected_size > self.max_size
+        )
+        if not is_overflowed:
+            last_id = await self._load(session, ids, last_id)
+            if last_id is None:
+                ids, last_id, is_overflowed = {}, 0, True
+        self._ids, self._last_id = ids, last_id
+        self.is_overflowed = is_overflowed
+
+    async def _load(
+            self,
+            session: AsyncSession,
+            ids: dict[str, array],
+            last_id: int
+    ) -> int | None:
+        """
+        Загружает в массивы ids из БД порциями по QUESTION_ID_INDEX_CHUNK_SIZE
+        ключи вопросов, разрешенных к выдаче, больше last_id. Возвращает
+        последний загруженный ключ либо None при превышении
+        QUESTION_ID_INDEX_MAX_SIZE (индекс до следующего полного
+        перестроения не используется).
+        """
+        while True:
+            chunk = await session.execute(
+                select(Question.id, Question.question_type)
+                .filter(
+                    Question.id > last_id,
+                    Question.is_condemned == false(),
+                    Question.is_published == true()
+                )
+                .order_by(Question.id)
+                .limit(self.chunk_size)
+            )
+            rows = chunk.all()
+            for row in rows:
+                ids.setdefault(
+                    row.question_type.name, array(ID_TYPECODE)
+                ).append(row.id)
+            if rows:
+                last_id = rows[-1].id
+            if sum(len(_) for _ in ids.values()) > self.max_size:
+                return None
+            if len(rows) < self.chunk_size:
+                return last_id
+
+    async def _load_changes(
+            self,
+            session: AsyncSession,
+            since: datetime
+    ) -> None:
+        """
+        Актуализирует индекс по вопросам с ключами не больше последнего
+        загруженного, измененным после since в любом процессе (например,
+        опубликованным через API, когда индекс используется страницами
+        сайта).
+        """
+        changes = await session.execute(
+            select(
+                Question.id,
+                Question.question_type,
+                Question.is_published,
+                Question.is_condemned
+            )
+            .filter(
+                Question.id <= self._last_id,
+                Question.updated_at > since
+            )
+        )
+        for question in changes.all():
+            self.update(question)
+
+    def _update_metrics(self) -> None:
+        metrics.set('question_id_index_size', len(self))
+        metrics.set('question_id_index_memory_bytes', self.memory_size)
+        metrics.set('question_id_index_overflowed', int(self.is_overflowed))
+        for question_type, ids in self._ids.items():
+            metrics.set(f'question_id_index_size_{question_type}', len(ids))
+
+    def discard(self, question_id: int) -> None:
+        """Удаляет ключ из индекса, если он в нем присутствует."""
+        for ids in self._ids.values():
+            try:
+                position = ids.index(question_id)
+            except ValueError:
+                continue
+            ids[position] = ids[-1]
+            ids.pop()
+
+    def update(self, question: Question | Row) -> None:
+        """
+        Актуализирует индекс после изменения вопроса. Вопросы с ключами
+        больше последнего загруженного будут подхвачены очередной загрузкой
+        изменений.
+        """
+        self.discard(question.id)
+        if (
+            self._built_at is not None
+            and not self.is_overflowed
+            and question.id <= self._last_id
+            and question.is_published
+            and not question.is_condemned
+        ):
+            self._ids.setdefault(
+                question.question_type.name, array(ID_TYPECODE)
+            ).append(question.id)
+
+    def sample(self, question_type: str | None, quantity: int) -> list[int]:
+        """
+        Возвращает не более quantity случайных неповторяющихся ключей
+        вопросов заданного типа (или вопросов всех типов).
+        """
+        if question_type:
+            arrays = [self._ids.get(question_type, array(ID_TYPECODE))]
+        else:
+            arrays = list(self._ids.values())
+        total = sum(len(_) for _ in arrays)
+        result = []
+        for position in random.sample(range(total), min(quantity, total)):
+            for ids in arrays:
+                if position < len(ids):
+                    result.append(ids[position])
+                    break
+                position -= len(ids)
+        return result
+
+    async def get_random_questions(
+            self,
+            session: AsyncSession,
+            question_type: str | None,
+            quantity: int,
+            fetch: Callable[[list[int]], Awaitable[Sequence[Any]]],
+            expected_size: int | None = None
+    ) -> list[Any] | None:
+        """
+        Выбирает из индекса случайные ключи и загружает соответствующие
+        им вопросы с помощью функции fetch, которая должна отбрасывать
+        вопросы, не разрешенные к выдаче. Устаревшие ключи удаляются из
+        индекса, а недостающие вопросы добираются повторной выборкой.
+        Если индекс не может быть использован - возвращает None.
+        """
+        await self.refresh(session, expected_size)
+        if self.is_overflowed:
+            return None
+        questions: dict[int, Any] = {}
+        for _ in range(const.QUESTION_ID_INDEX_SAMPLING_ATTEMPTS):
+            pk_list = [
+                pk for pk in self.sample(
+                    question_type, quantity - len(questions)
+                )
+                if pk not in questions
+            ]
+            if not pk_list:
+                break
+            fetched = {question.id: question for question in await fetch(
+                pk_list
+            )}
+            for pk in pk_list:
+                if pk in fetched:
+                    questions[pk] = fetched[pk]
+                else:
+                    self.discard(pk)
+                    metrics.inc('question_id_index_stale_ids_total')
+            if len(questions) >= quantity:
+                break
+        return list(questions.values())
+
+
+question_id_index = QuestionIdIndex()
@@ -0,0 +1,74 @@
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from sqlalchemy import Row, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.questions import QuestionIndexOutbox
+
+
+def add_question_index_outbox_record(
+        session: AsyncSession,
+        question_id: int
+) -> None:
+    """
+    Добавляет в текущую транзакцию запись об изменении вопроса для
+    последующей синхронизации индекса Elasticsearch. Индекс SQLite FTS5
+    синхронизируется триггерами и записей не требует.
+    """
+    if settings.search_backend == 'elasticsearch':
+        session.add(QuestionIndexOutbox(question_id=question_id))
+
+
+def get_question_index_outbox_batch(
+        session: Session,
+        batch_size: int
+) -> Sequence[Row]:
+    """
+    Выбирает очередную порцию записей об изменениях вопросов. Выбранные
+    записи блокируются до завершения транзакции, а заблокированные другими
+    обработчиками - пропускаются (в PostgreSQL).
+    """
+    records = session.execute(
+        select(QuestionIndexOutbox.id, QuestionIndexOutbox.question_id)
+        .order_by(QuestionIndexOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return records.all()
+
+
+def delete_question_index_outbox_records(
+        session: Session,
+        record_ids: list[int]
+) -> None:
+    """Удаляет обработанные записи об изменениях вопросов."""
+    session.execute(
+        delete(QuestionIndexOutbox)
+        .where(QuestionIndexOutbox.id.in_(record_ids))
+    )
+
+
+async def get_question_index_outbox_stats(
+        session: AsyncSession
+) -> dict[str, float]:
+    """
+    Возвращает количество изменений вопросов, ожидающих переноса в индекс,
+    и отставание индекса от БД (в секундах).
+    """
+    stats = await session.execute(
+        select(func.count(), func.min(QuestionIndexOutbox.created_at))
+    )
+    backlog, oldest_record_created_at = stats.one()
+    lag = 0
+    if oldest_record_created_at is not None:
+        if oldest_record_created_at.tzinfo is None:
+            oldest_record_created_at = oldest_record_created_at.replace(
+                tzinfo=timezone.utc
+            )
+        lag = (
+            datetime.now(timezone.utc) - oldest_record_created_at
+        ).total_seconds()
+    return {'backlog': backlog, 'lag_seconds': lag}
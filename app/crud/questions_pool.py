@@ -0,0 +1,162 @@
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timezone
+import random
+from typing import Any
+
+from redis import Redis, RedisError
+from sqlalchemy import false, select, true
+from sqlalchemy.orm import Session
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.core.redis import redis_client
+from app.crud.questions_random_key import (get_first_by_random_key_query,
+                                           get_random_key_seek_queries)
+from app.models.questions import Question
+
+# Ключ хеша со статистикой пополнения пулов
+QUESTION_POOL_STATS_KEY: str = 'question-pool:stats'
+
+
+def get_question_pool_key(question_type: str) -> str:
+    """Возвращает ключ списка Redis, содержащего пул вопросов."""
+    return f'question-pool:{question_type}'
+
+
+async def pop_question_ids(question_type: str, quantity: int) -> list[int]:
+    """
+    Извлекает из пула первичные ключи вопросов. При недоступности Redis
+    возвращает пустой список.
+    """
+    key = get_question_pool_key(question_type)
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.lpop(key, quantity)
+            pipe.llen(key)
+            pk_list, pool_depth = await pipe.execute()
+    except RedisError:
+        metrics.inc('question_pool_redis_errors_total')
+        return []
+    metrics.set(f'question_pool_depth_{question_type}', pool_depth)
+    return [int(_) for _ in pk_list or []]
+
+
+async def get_pooled_questions(
+        question_type: str | None,
+        quantity: int,
+        fetch: Callable[[list[int]], Awaitable[Sequence[Any]]],
+) -> list[Any]:
+    """
+    Возвращает вопросы, ключи которых извлечены из пула, с помощью функции
+    fetch, которая должна отбрасывать вопросы, не разрешенные к выдаче.
+    Если вопросов в пуле недостаточно, вызывающая функция должна добрать
+    их из БД.
+    """
+    if question_type not in const.QUESTION_POOL_TYPES:
+        return []
+    pk_list = list(dict.fromkeys(
+        await pop_question_ids(question_type, quantity)
+    ))
+    questions = []
+    if pk_list:
+        fetched = {question.id: question for question in await fetch(
+            pk_list
+        )}
+        questions = [fetched[pk] for pk in pk_list if pk in fetched]
+    if len(questions) < quantity:
+        metrics.inc('question_pool_fallbacks_total')
+    return questions
+
+
+def merge_questions(
+        pooled_questions: list[Any],
+        sampled_questions: Sequence[Any],
+        quantity: int
+) -> list[Any]:
+    """
+    Дополняет вопросы из пула вопросами, выбранными из БД, исключая повторы.
+    """
+    pooled_ids = {question.id for question in pooled_questions}
+    questions = pooled_questions + [
+        question for question in sampled_questions
+        if question.id not in pooled_ids
+    ]
+    return questions[:quantity]
+
+
+def refill_question_pool(
+        session: Session,
+        redis: Redis,
+        question_type: str
+) -> int:
+    """
+    Пополняет пул вопросов заданного типа, если количество вопросов в нем
+    меньше QUESTION_POOL_LOW_WATER_MARK. Ключи вопросов выбираются
+    независимыми поисками по случайному ключу (см.
+    get_random_key_seek_queries). Повторившиеся ключи и ключи, которые
+    еще находятся в пуле, отбрасываются, поэтому извлеченные из пула ключи
+    не повторяются. Возвращает количество добавленных в пул вопросов.
+    """
+    key = get_question_pool_key(question_type)
+    pooled_ids = redis.lrange(key, 0, -1)
+    if len(pooled_ids) >= const.QUESTION_POOL_LOW_WATER_MARK:
+        return 0
+    query = select(Question.id).filter(
+        Question.question_type == question_type,
+        Question.is_condemned == false(),
+        Question.is_published == true()
+    )
+    pk_list = []
+    for seek_query in get_random_key_seek_queries(
+        query, const.QUESTION_POOL_REFILL_SIZE
+    ):
+        pk_list.extend(session.scalars(seek_query).all())
+    if len(pk_list) < const.QUESTION_POOL_REFILL_SIZE:
+        pk_list.extend(
+            session.scalars(get_first_by_random_key_query(query)).all()
+        )
+    pooled_ids = {int(_) for _ in pooled_ids}
+    pk_list = [pk for pk in dict.fromkeys(pk_list) if pk not in pooled_ids]
+    if not pk_list:
+        return 0
+    random.shuffle(pk_list)
+    with redis.pipeline() as pipe:
+        pipe.rpush(key, *pk_list)
+        pipe.hincrby(QUESTION_POOL_STATS_KEY, f'refills_{question_type}', 1)
+        pipe.hincrby(
+            QUESTION_POOL_STATS_KEY,
+            f'refilled_ids_{question_type}',
+            len(pk_list)
+        )
+        pipe.hset(
+            QUESTION_POOL_STATS_KEY,
+            f'last_refill_timestamp_{question_type}',
+            datetime.now(timezone.utc).timestamp()
+        )
+        pipe.execute()
+    return len(pk_list)
+
+
+async def get_question_pool_stats() -> dict[str, float]:
+    """
+    Возвращает текущую глубину пулов и статистику их пополнения. При
+    недоступности Redis возвращает пустой словарь.
+    """
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for question_type in const.QUESTION_POOL_TYPES:
+                pipe.llen(get_question_pool_key(question_type))
+            pipe.hgetall(QUESTION_POOL_STATS_KEY)
+            *pool_depths, refill_stats = await pipe.execute()
+    except RedisError:
+        return {}
+    stats = {
+        f'depth_{question_type}': pool_depth
+        for question_type, pool_depth in zip(
+            const.QUESTION_POOL_TYPES, pool_depths
+        )
+    }
+    stats.update({
+        name.decode(): float(value) for name, value in refill_stats.items()
+    })
+    return stats
@@ -0,0 +1,46 @@
+import random
+
+from sqlalchemy import CompoundSelect, Select, select, union_all
+
+from app.models.questions import Question
+
+# Максимальное количество поисков по случайному ключу, объединяемых в один
+# запрос (SQLite ограничивает количество частей составного запроса)
+RANDOM_KEY_SEEKS_PER_QUERY: int = 100
+
+
+def get_random_key_seek_queries(
+        id_query: Select,
+        quantity: int
+) -> list[CompoundSelect]:
+    """
+    Формирует запросы, выполняющие quantity независимых поисков
+    по случайному ключу: для каждой случайной точки диапазона [0, 1)
+    выбирается первичный ключ одной записи - первой, случайный ключ которой
+    не меньше точки. Для точки, за которой записей нет, запись не выбирается
+    (см. get_first_by_random_key_query). Запрос id_query должен выбирать
+    только первичный ключ вопроса и содержать фильтры по статусу и типу
+    вопроса, чтобы каждый поиск выполнялся по частичному индексу.
+    """
+    seeks = [
+        select(
+            id_query.filter(Question.random_key >= random.random())
+            .order_by(Question.random_key)
+            .limit(1)
+            .subquery()
+        )
+        for _ in range(quantity)
+    ]
+    return [
+        union_all(*seeks[start:start + RANDOM_KEY_SEEKS_PER_QUERY])
+        for start in range(0, quantity, RANDOM_KEY_SEEKS_PER_QUERY)
+    ]
+
+
+def get_first_by_random_key_query(id_query: Select) -> Select:
+    """
+    Формирует запрос первичного ключа записи с наименьшим случайным ключом,
+    которая выбирается для точек, за которыми записей нет (выборка
+    продолжается с начала диапазона).
+    """
+    return id_query.order_by(Question.random_key).limit(1)
@@ -0,0 +1,55 @@
+from collections.abc import Callable
+
+from fastapi import Request, Response
+
+# Префикс ключей Redis, под которыми fastapi-cache хранит ответы эндпойнтов
+RESPONSE_CACHE_PREFIX: str = 'fastapi-cache'
+
+
+def get_question_cache_key(question_id: int, etag: str | None) -> str:
+    """
+    Возвращает ключ Redis, под которым хранится ответ с вопросом. Ключ
+    включает ETag версии вопроса, поэтому после изменения вопроса прежний
+    ответ не выдается и удаляется по истечении времени хранения.
+    """
+    return f'{RESPONSE_CACHE_PREFIX}:question:{question_id}:{etag}'
+
+
+def get_user_questions_cache_key(user_id: int, etag: str | None) -> str:
+    """
+    Возвращает ключ Redis, под которым хранится ответ со списком вопросов,
+    добавленных пользователем. Ключ включает ETag сводной версии списка.
+    """
+    return f'{RESPONSE_CACHE_PREFIX}:user-questions:{user_id}:{etag}'
+
+
+def question_key_builder(
+        func: Callable,
+        namespace: str = '',
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: tuple = (),
+        kwargs: dict | None = None
+) -> str:
+    """
+    Формирует ключ кэша ответа эндпойнта получения вопроса по id вопроса
+    и ETag его версии.
+    """
+    return get_question_cache_key(kwargs['id'], kwargs['etag'])
+
+
+def user_questions_key_builder(
+        func: Callable,
+        namespace: str = '',
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: tuple = (),
+        kwargs: dict | None = None
+) -> str:
+    """
+    Формирует ключ кэша ответа эндпойнта получения вопросов, добавленных
+    текущим пользователем, по id пользователя и ETag версии списка.
+    """
+    return get_user_questions_cache_key(kwargs['user'].id, kwargs['etag'])
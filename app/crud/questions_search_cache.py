@@ -0,0 +1,173 @@
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from hashlib import sha1
+import json
+
+from redis import RedisError
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.core.redis import redis_client
+
+# Ключ счетчика версий содержимого Базы вопросов. Счетчик увеличивается
+# при каждом изменении вопросов, что делает недействительными все
+# сохраненные ранее результаты поиска.
+QUESTION_CORPUS_VERSION_KEY: str = 'question-corpus-version'
+
+
+def normalize_search_pattern(search_pattern: str) -> str:
+    """Приводит шаблон поиска к нижнему регистру и схлопывает пробелы."""
+    return ' '.join(search_pattern.casefold().split())
+
+
+def get_search_cache_key(
+        search_type: str,
+        search_pattern: str,
+        question_type: str | None,
+        quantity: int,
+        options: dict | None = None
+) -> str:
+    """
+    Возвращает ключ Redis, под которым хранится результат поиска. options -
+    прочие параметры, от которых зависит результат (курсор страницы
+    результатов, фильтры и т.п.).
+    """
+    pattern_hash = sha1(
+        f'{normalize_search_pattern(search_pattern)}\n'
+        f'{json.dumps(options or {}, sort_keys=True)}'.encode()
+    ).hexdigest()
+    return (f'question-search:{search_type}:{question_type or ""}:'
+            f'{quantity}:{pattern_hash}')
+
+
+def count_search_cache_lookup(cache_name: str, is_hit: bool) -> None:
+    """
+    Учитывает обращение к кэшу результатов поиска в метриках и пересчитывает
+    долю запросов, обслуженных из кэша.
+    """
+    metrics.inc(f'{cache_name}_{"hits" if is_hit else "misses"}_total')
+    hits = metrics.get(f'{cache_name}_hits_total')
+    misses = metrics.get(f'{cache_name}_misses_total')
+    metrics.set(f'{cache_name}_hit_ratio', hits / (hits + misses))
+
+
+async def read_search_cache(key: str) -> tuple[int, dict | None]:
+    """
+    Возвращает текущую версию содержимого Базы и результат поиска,
+    сохраненный при этой версии, либо None, если результата нет или он
+    устарел.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(QUESTION_CORPUS_VERSION_KEY)
+        pipe.get(key)
+        version, cached_result = await pipe.execute()
+    version = int(version or 0)
+    if cached_result is not None:
+        cached_result = json.loads(cached_result)
+        if cached_result['version'] == version:
+            return version, cached_result
+    return version, None
+
+
+async def write_search_cache(
+        key: str,
+        version: int,
+        result: dict,
+        expire: int
+) -> None:
+    """Сохраняет результат поиска с версией содержимого Базы."""
+    try:
+        await redis_client.set(
+            key, json.dumps({'version': version, **result}), ex=expire
+        )
+    except RedisError:
+        metrics.inc('question_search_cache_redis_errors_total')
+
+
+async def get_cached_search_questions(
+        search_type: str,
+        search_pattern: str,
+        question_type: str | None,
+        quantity: int,
+        options: dict | None,
+        search: Callable[[], Awaitable[tuple[Sequence[Mapping], dict]]]
+) -> tuple[Sequence[Mapping], dict]:
+    """
+    Возвращает страницу результатов поиска вопросов и сведения о ней
+    (заголовки ответа, фасеты и т.п. - любые данные, сериализуемые
+    в JSON). Найденные вопросы и сведения о странице сохраняются в Redis
+    целиком вместе с версией содержимого Базы, при которой выполнялся
+    поиск, и используются, пока версия не изменилась: любое изменение
+    вопросов увеличивает версию, поэтому сохраненная страница не расходится
+    с Базой, а повторный запрос не обращается ни к поисковому движку,
+    ни к Базе. Иначе поиск выполняется функцией search. При недоступности
+    Redis поиск выполняется без кэширования.
+    """
+    key = get_search_cache_key(
+        search_type, search_pattern, question_type, quantity, options
+    )
+    try:
+        version, cached_result = await read_search_cache(key)
+    except RedisError:
+        metrics.inc('question_search_cache_redis_errors_total')
+        return await search()
+    count_search_cache_lookup(
+        'question_search_cache', cached_result is not None
+    )
+    if cached_result is not None:
+        return cached_result['questions'], cached_result['page_info']
+    questions, page_info = await search()
+    await write_search_cache(
+        key,
+        version,
+        {
+            'questions': [dict(question) for question in questions],
+            'page_info': page_info
+        },
+        const.SEARCH_CACHING_TIME
+    )
+    return questions, page_info
+
+
+async def get_cached_suggestions(
+        prefix: str,
+        question_type: str | None,
+        quantity: int,
+        suggest: Callable[[], Awaitable[list[dict]]]
+) -> list[dict]:
+    """
+    Возвращает подсказки для начала текста вопроса. Подсказки невелики
+    и сохраняются в Redis целиком на SUGGEST_CACHING_TIME (и до изменения
+    версии содержимого Базы), поэтому повторные запросы обслуживаются
+    без обращения к поисковому движку. При недоступности Redis подсказки
+    формируются функцией suggest без кэширования.
+    """
+    key = get_search_cache_key('suggest', prefix, question_type, quantity)
+    try:
+        version, cached_result = await read_search_cache(key)
+    except RedisError:
+        metrics.inc('question_search_cache_redis_errors_total')
+        return await suggest()
+    count_search_cache_lookup(
+        'question_suggest_cache', cached_result is not None
+    )
+    if cached_result is not None:
+        return cached_result['suggestions']
+    suggestions = await suggest()
+    await write_search_cache(
+        key,
+        version,
+        {'suggestions': suggestions},
+        const.SUGGEST_CACHING_TIME
+    )
+    return suggestions
+
+
+async def bump_question_corpus_version() -> None:
+    """
+    Увеличивает версию содержимого Базы вопросов после изменения вопроса.
+    Сохраненные результаты поиска перестают использоваться.
+    """
+    try:
+        await redis_client.incr(QUESTION_CORPUS_VERSION_KEY)
+    except RedisError:
+        metrics.inc('question_search_cache_redis_errors_total')
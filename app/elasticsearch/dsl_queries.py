@@ -1,3 +1,7 @@
+import random
+
+from app.core.constants import QUESTION_FACET_SIZE
+
 QUESTION_INDEX_MAPPING: dict = {
     'properties': {
         'pk': {
@@ -8,6 +12,56 @@ QUESTION_INDEX_MAPPING: dict = {
         },
         'question': {
             'type': 'text',
+            'analyzer': 'ru',
+            'fields': {
+                # Подполе для подсказок при наборе текста: начала слов
+                # индексируются как отдельные термы
+                'suggest': {
+                    'type': 'text',
+                    'analyzer': 'question_suggest',
+                    'search_analyzer': 'standard',
+                },
+                # Подполе для поиска по подстроке (запрос wildcard)
+                # без полного просмотра таблицы вопросов
+                'wildcard': {
+                    'type': 'wildcard',
+                },
+            },
+        },
+        'package': {
+            'type': 'keyword',
+        },
+        # Поля, по которым поиск не выполняется: хранятся в _source,
+        # чтобы результаты поиска выдавались без обращения к БД
+        'tour': {
+            'type': 'keyword',
+            'index': False,
+        },
+        'number': {
+            'type': 'integer',
+            'index': False,
+        },
+        'answer': {
+            'type': 'text',
+            'index': False,
+        },
+        'pass_criteria': {
+            'type': 'text',
+            'index': False,
+        },
+        # Значения полей package и authors (целиком) используются
+        # для фасетов и фильтров полнотекстового поиска
+        'authors': {
+            'type': 'keyword',
+            'ignore_above': 256,
+        },
+        'sources': {
+            'type': 'text',
+            'index': False,
+        },
+        'comments': {
+            'type': 'text',
+            'index': False,
         },
     },
 }
@@ -23,16 +77,41 @@ QUESTION_INDEX_SETTINGS: dict = {
                 'type': 'stemmer',
                 'language': 'russian',
             },
+            'question_suggest_edge_ngram': {
+                'type': 'edge_ngram',
+                'min_gram': 1,
+                'max_gram': 20,
+            },
         },
         'analyzer': {
             'ru': {
                 'tokenizer': 'standard',
                 'filter': ['lowercase', 'russian_stop', 'russian_stemmer'],
             },
+            'question_suggest': {
+                'tokenizer': 'standard',
+                'filter': ['lowercase', 'question_suggest_edge_ngram'],
+            },
         },
     },
 }
 
+# Порядок выдачи найденных вопросов: по убыванию релевантности, при равной
+# релевантности - по первичному ключу (для постраничной выдачи через
+# search_after)
+QUESTION_SEARCH_SORT: list = [
+    {'_score': 'desc'},
+    {'pk': 'asc'},
+]
+
+# Ступени полнотекстового поиска: точное совпадение фразы, совпадение
+# основ слов (анализатор ru), нечеткое совпадение (самое дорогое - каждый
+# терм раскрывается во множество вариантов)
+QUESTION_SEARCH_STAGES: tuple[str, ...] = ('phrase', 'stemmed', 'fuzzy')
+
+# Символы, имеющие специальное значение в шаблоне запроса wildcard
+WILDCARD_SPECIAL_CHARACTERS: tuple[str, ...] = ('\\', '*', '?')
+
 GET_ALL_DOCS_IN_INDEX: dict = {
     'query': {
         'match_all': {}
@@ -40,35 +119,170 @@ GET_ALL_DOCS_IN_INDEX: dict = {
 }
 
 
+def get_stage_match_query(search_pattern: str, stage: str) -> dict:
+    """Запрос совпадения текста вопроса ступени stage."""
+    if stage == 'phrase':
+        return {'match_phrase': {'question': {'query': search_pattern}}}
+    if stage == 'stemmed':
+        return {'match': {'question': {'query': search_pattern}}}
+    return {
+        'match': {
+            'question': {
+                'query': search_pattern,
+                'fuzziness': 'auto'
+            }
+        }
+    }
+
+
 def get_searh_query(
         search_pattern: str,
-        question_type: str = None
+        question_type: str = None,
+        search_after: list | None = None,
+        stage: str = 'fuzzy',
+        facet_filters: dict[str, str] | None = None,
+        facet_fields: tuple[str, ...] = (),
+        excluded_stages: tuple[str, ...] = ()
 ) -> dict:
-    if not question_type:
-        return {
+    """
+    Запрос полнотекстового поиска ступени stage (см. QUESTION_SEARCH_STAGES).
+    facet_filters - точные значения полей, которым должны соответствовать
+    вопросы; для полей facet_fields в том же запросе подсчитываются
+    количества найденных вопросов по значениям поля (агрегации terms).
+    Вопросы, найденные ступенями excluded_stages, исключаются.
+    """
+    match_query = get_stage_match_query(search_pattern, stage)
+    filters = dict(facet_filters or {})
+    if question_type:
+        filters['question_type'] = question_type
+    if not filters and not excluded_stages:
+        query = {'query': match_query}
+    else:
+        query = {
             'query': {
-                'match': {
-                    'question': {
-                        'query': search_pattern,
-                        'fuzziness': 'auto'
-                    }
+                'bool': {
+                    'filter': [
+                        {'term': {field: value}}
+                        for field, value in filters.items()
+                    ],
+                    'must': match_query,
+                    'must_not': [
+                        get_stage_match_query(search_pattern, excluded_stage)
+                        for excluded_stage in excluded_stages
+                    ]
                 }
             }
         }
-    return {
-        'query': {
+    query['sort'] = QUESTION_SEARCH_SORT
+    if search_after is not None:
+        query['search_after'] = search_after
+    if facet_fields:
+        query['aggs'] = {
+            field: {'terms': {'field': field, 'size': QUESTION_FACET_SIZE}}
+            for field in facet_fields
+        }
+    return query
+
+
+def get_suggest_query(
+        prefix: str,
+        question_type: str = None
+) -> dict:
+    """
+    Запрос подсказок: вопросы, в которых встречаются все слова начала
+    текста (последнее слово может быть не дописано).
+    """
+    query = {
+        'match': {
+            'question.suggest': {
+                'query': prefix,
+                'operator': 'and'
+            }
+        }
+    }
+    if question_type:
+        query = {
             'bool': {
                 'filter': [{
                     'term': {'question_type': question_type}
                 }],
-                'must': {
-                    'match': {
-                        'question': {
-                            'query': search_pattern,
-                            'fuzziness': 'auto'
-                        }
+                'must': query
+            }
+        }
+    return {'query': query, '_source': ['pk', 'question']}
+
+
+def get_substring_search_filters(
+        search_pattern: str,
+        question_type: str = None
+) -> list[dict]:
+    """
+    Фильтры вопросов, текст которых содержит подстроку (без учета
+    регистра).
+    """
+    for character in WILDCARD_SPECIAL_CHARACTERS:
+        search_pattern = search_pattern.replace(character, f'\\{character}')
+    filters = [{
+        'wildcard': {
+            'question.wildcard': {
+                'value': f'*{search_pattern}*',
+                'case_insensitive': True
+            }
+        }
+    }]
+    if question_type:
+        filters.append({'term': {'question_type': question_type}})
+    return filters
+
+
+def get_substring_search_query(
+        search_pattern: str,
+        question_type: str = None,
+        search_after: list | None = None
+) -> dict:
+    """
+    Запрос вопросов, текст которых содержит подстроку (без учета регистра).
+    Вопросы выдаются по возрастанию первичного ключа.
+    """
+    query = {
+        'query': {
+            'bool': {
+                'filter': get_substring_search_filters(
+                    search_pattern, question_type
+                )
+            }
+        },
+        'sort': [{'pk': 'asc'}],
+    }
+    if search_after is not None:
+        query['search_after'] = search_after
+    return query
+
+
+def get_random_substring_search_query(
+        search_pattern: str,
+        question_type: str = None
+) -> dict:
+    """
+    Запрос случайной выборки из всех вопросов, текст которых содержит
+    подстроку (без учета регистра): найденным вопросам присваивается
+    случайная релевантность с новым начальным значением при каждом запросе.
+    """
+    return {
+        'query': {
+            'function_score': {
+                'query': {
+                    'bool': {
+                        'filter': get_substring_search_filters(
+                            search_pattern, question_type
+                        )
                     }
-                }
+                },
+                'random_score': {
+                    'seed': random.randrange(2 ** 31),
+                    'field': '_seq_no'
+                },
+                'boost_mode': 'replace'
             }
         }
     }
@@ -1,12 +1,170 @@
-from elastic_transport import ObjectApiResponse
-from elasticsearch import (Elasticsearch, BadRequestError, helpers,
-                           NotFoundError)
-from sqlalchemy import desc, false, select, true
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from datetime import datetime, timezone
+import time
+from typing import Any
+
+from elastic_transport import ObjectApiResponse, TransportError
+from elasticsearch import (ApiError, AsyncElasticsearch, Elasticsearch,
+                           BadRequestError, helpers, NotFoundError)
+from elasticsearch.helpers import BulkIndexError
+from sqlalchemy import Row, false, select, true
 
 from app.core.config import settings
+import app.core.constants as const
 from app.core.db import sync_session_factory
+from app.core.metrics import metrics
+from app.crud.questions_api import get_question_rows_query
 from app.elasticsearch import dsl_queries as dsl
-from app.models.questions import Question
+from app.models.questions import Question, QuestionType
+from app.schemas.questions import QuestionDB
+
+# Поля схемы QuestionDB, хранимые в документе индекса (первичный ключ
+# хранится в поле pk)
+QUESTION_DOCUMENT_FIELDS: tuple[str, ...] = tuple(
+    field for field in QuestionDB.model_fields if field != 'id'
+)
+
+
+# Внешняя версия удаления документа вопроса, удаленного из БД: превышает
+# номер любой версии вопроса
+QUESTION_DELETED_VERSION: int = 2 ** 62
+
+
+def get_question_document(question: Question) -> dict:
+    """
+    Приводит вопрос в готовый для экспорта в индекс вид. Документ содержит
+    все поля схемы QuestionDB, идентификатором документа в индексе служит
+    первичный ключ вопроса.
+    """
+    document = {
+        field: getattr(question, field) for field in QUESTION_DOCUMENT_FIELDS
+    }
+    document['pk'] = question.id
+    document['question_type'] = question.question_type.value
+    return document
+
+
+def get_versioned_index_action(index: str, question: Row) -> dict:
+    """
+    Формирует команду bulk API для индекса, в который выполняется
+    переиндексация. Номер версии вопроса передается как внешняя версия
+    документа, поэтому документ не заменяется более старой версией вопроса,
+    независимо от порядка выполнения команд.
+    """
+    return {
+        '_index': index,
+        '_id': question.id,
+        '_version': question.version,
+        '_version_type': 'external',
+        **get_question_document(question)
+    }
+
+
+def get_versioned_delete_action(
+        index: str,
+        question_id: int,
+        version: int | None
+) -> dict:
+    """
+    Формирует команду удаления документа из индекса, в который выполняется
+    переиндексация. Удаление сохраняет в индексе сведения об удаленном
+    документе (tombstone) с внешней версией, поэтому загрузка прочитанного
+    ранее вопроса с меньшей версией не восстанавливает документ. Для вопроса,
+    удаленного из БД (version=None), используется наибольшая версия.
+    """
+    return {
+        '_op_type': 'delete',
+        '_index': index,
+        '_id': question_id,
+        '_version': QUESTION_DELETED_VERSION if version is None else version,
+        '_version_type': 'external'
+    }
+
+
+def is_ignored_bulk_error(error: dict) -> bool:
+    """
+    Проверяет, что ошибка bulk API не требует повторной синхронизации:
+    удаляемый документ отсутствует в индексе либо документ уже имеет
+    не меньшую внешнюю версию.
+    """
+    (op_type, result), = error.items()
+    return (
+        result.get('status') == 409
+        or op_type == 'delete' and result.get('status') == 404
+    )
+
+
+def get_question_from_document(document: dict) -> dict:
+    """
+    Приводит документ индекса к виду записи, выбранной запросом
+    get_question_rows_query. Поля, отсутствующие в документе, принимают
+    значение None.
+    """
+    question = {'id': document['pk']}
+    question.update({
+        field: document.get(field) for field in QUESTION_DOCUMENT_FIELDS
+    })
+    question['question_type'] = QuestionType(document['question_type'])
+    return question
+
+
+def get_questions_from_search_result(
+        search_result: ObjectApiResponse
+) -> list[dict]:
+    """
+    Возвращает найденные вопросы, сформированные из содержимого документов
+    индекса (_source), без обращения к БД.
+    """
+    return [
+        get_question_from_document(_['_source'])
+        for _ in search_result.body['hits']['hits']
+    ]
+
+
+def get_next_search_after(
+        search_result: ObjectApiResponse,
+        quantity: int
+) -> list | None:
+    """
+    Возвращает значения сортировки последнего найденного вопроса для
+    запроса следующей страницы результатов либо None, если страница
+    неполная и найденных вопросов больше нет.
+    """
+    hits = search_result.body['hits']['hits']
+    if len(hits) < quantity:
+        return None
+    return hits[-1]['sort']
+
+
+def get_facets_from_search_result(
+        search_result: ObjectApiResponse
+) -> dict[str, list[dict]]:
+    """Возвращает фасеты из агрегаций результата поиска."""
+    return {
+        field: [
+            {'value': bucket['key'], 'count': bucket['doc_count']}
+            for bucket in aggregation['buckets']
+        ]
+        for field, aggregation in search_result.body['aggregations'].items()
+    }
+
+
+def get_async_es_client(
+        host: str = settings.elasticsearch_host,
+        port: str = settings.elasticsearch_port,
+) -> AsyncElasticsearch:
+    """
+    Создает асинхронный клиент Elasticsearch с пулом соединений. Клиент
+    создается один раз при запуске приложения и используется всеми запросами.
+    """
+    return AsyncElasticsearch(
+        f'http://{host}:{port}',
+        request_timeout=const.ELASTICSEARCH_REQUEST_TIMEOUT,
+        retry_on_timeout=True,
+        max_retries=const.ELASTICSEARCH_MAX_RETRIES,
+        connections_per_node=const.ELASTICSEARCH_CONNECTIONS_PER_NODE
+    )
 
 
 class ElasticSearchBase():
@@ -65,102 +223,467 @@ class ElasticSearchBase():
 
 
 class ElasticSearchQuestion(ElasticSearchBase):
-    """Класс для работы с индексом вопросов для интеллектуальных игр."""
+    """
+    Класс для работы с индексом вопросов для интеллектуальных игр. Поиск
+    выполняется по псевдониму (alias) self.index, который указывает на
+    версионный индекс с именем вида "<self.index>_v<дата и время создания>".
+    """
+
+    def _get_versioned_indices(self) -> list[str]:
+        """Возвращает имена версионных индексов в порядке их создания."""
+        return sorted(
+            self.es_client.indices.get(index=f'{self.index}_v*').body
+        )
+
+    def _get_aliased_indices(self) -> list[str]:
+        """Возвращает имена индексов, на которые указывает псевдоним."""
+        if not self.es_client.indices.exists_alias(name=self.index):
+            return []
+        return list(self.es_client.indices.get_alias(name=self.index).body)
+
+    def _get_unfinished_index(self) -> str | None:
+        """
+        Возвращает имя последнего версионного индекса, переиндексация
+        в который не была завершена (псевдоним на него не указывает).
+        """
+        aliased_indices = self._get_aliased_indices()
+        unfinished_indices = [
+            index for index in self._get_versioned_indices()
+            if index not in aliased_indices
+        ]
+        return unfinished_indices[-1] if unfinished_indices else None
+
+    def _get_checkpoint(self, index: str) -> int:
+        """
+        Возвращает первичный ключ последнего вопроса, гарантированно
+        загруженного в индекс (хранится в метаданных маппинга индекса).
+        """
+        mapping = self.es_client.indices.get_mapping(index=index).body
+        return mapping[index]['mappings'].get('_meta', {}).get('last_id', 0)
+
+    def _set_checkpoint(self, index: str, last_id: int) -> None:
+        """Сохраняет в метаданных маппинга индекса прогресс загрузки."""
+        self.es_client.indices.put_mapping(
+            index=index, meta={'last_id': last_id}
+        )
+
+    def _create_versioned_index(self) -> str:
+        """
+        Создает новый версионный индекс. На время загрузки отключаются
+        обновление индекса и реплики, а сведения об удаленных документах
+        хранятся до завершения загрузки (QUESTION_REINDEX_GC_DELETES).
+        """
+        index = f'{self.index}_v{datetime.now(timezone.utc):%Y%m%d%H%M%S}'
+        self.es_client.indices.create(
+            index=index,
+            mappings=dsl.QUESTION_INDEX_MAPPING,
+            settings={
+                **dsl.QUESTION_INDEX_SETTINGS,
+                'number_of_replicas': 0,
+                'refresh_interval': '-1',
+                'gc_deletes': const.QUESTION_REINDEX_GC_DELETES,
+            }
+        )
+        return index
 
-    @staticmethod
-    def __prepare_questions(right_idx: int, left_idx: int) -> list[dict]:
+    def _generate_index_actions(
+            self,
+            index: str,
+            last_id: int
+    ) -> Iterator[dict]:
         """
-        Выбирает из БД вопросы, соответствующие переданному диапазону первичных
-        ключей, и приводит их в готовый для экспорта в индекс вид.
+        Построчно выбирает из БД вопросы, разрешенные к выдаче, с ключами
+        больше last_id (серверным курсором - в PostgreSQL) и формирует
+        из них команды для bulk API с внешней версией документа (см.
+        get_versioned_index_action): вопрос, измененный после чтения,
+        не заменяет в индексе более новую версию, записанную
+        синхронизацией изменений.
         """
-        question_list = []
         with sync_session_factory() as session:
             questions = session.execute(
-                select(Question.id, Question.question_type, Question.question)
+                get_question_rows_query()
+                .add_columns(Question.version)
                 .filter(
-                    Question.id.between(right_idx, left_idx),
+                    Question.id > last_id,
                     Question.is_condemned == false(),
                     Question.is_published == true()
                 )
+                .order_by(Question.id)
+                .execution_options(yield_per=const.QUESTION_REINDEX_CHUNK_SIZE)
             )
-        for question in questions.all():
-            question_list.append({
-                'pk': question.id,
-                'question_type': question.question_type.value,
-                'question': question.question})
-        return question_list
+            for question in questions:
+                yield get_versioned_index_action(index, question)
+
+    def _switch_alias(self, index: str) -> None:
+        """
+        Атомарно переключает псевдоним на новый индекс и удаляет прежние
+        индексы. Индекс, созданный до перехода на псевдонимы под именем
+        self.index, удаляется в той же операции.
+        """
+        aliased_indices = self._get_aliased_indices()
+        actions = [{'add': {'index': index, 'alias': self.index}}]
+        actions.extend(
+            {'remove': {'index': aliased_index, 'alias': self.index}}
+            for aliased_index in aliased_indices
+        )
+        if (
+            not aliased_indices
+            and self.es_client.indices.exists(index=self.index)
+        ):
+            actions.append({'remove_index': {'index': self.index}})
+        self.es_client.indices.update_aliases(actions=actions)
+        for aliased_index in aliased_indices:
+            if aliased_index != index:
+                self.es_client.indices.delete(index=aliased_index)
+
+    def reindex(self, resume: bool = True) -> str:
+        """
+        Переиндексирует вопросы без прерывания поиска: вопросы загружаются
+        в новый версионный индекс через parallel_bulk, после чего псевдоним
+        атомарно переключается на него. Прогресс сохраняется каждые
+        QUESTION_REINDEX_CHECKPOINT_INTERVAL документов; при resume=True
+        незавершенная переиндексация продолжается с места остановки.
+        Возвращает имя нового индекса.
+        """
+        index = self._get_unfinished_index() if resume else None
+        if index is None:
+            aliased_indices = self._get_aliased_indices()
+            for unfinished_index in self._get_versioned_indices():
+                if unfinished_index not in aliased_indices:
+                    self.es_client.indices.delete(index=unfinished_index)
+            index = self._create_versioned_index()
+            print(f'Создан индекс {index}')
+        last_id = self._get_checkpoint(index)
+        if last_id:
+            print(f'Продолжение загрузки в {index} с вопроса id > {last_id}')
+        indexed_count = 0
+        start = time.perf_counter()
+        for is_ok, item in helpers.parallel_bulk(
+            self.es_client,
+            self._generate_index_actions(index, last_id),
+            thread_count=const.QUESTION_REINDEX_THREAD_COUNT,
+            chunk_size=const.QUESTION_REINDEX_CHUNK_SIZE,
+            raise_on_error=False
+        ):
+            if not is_ok and not is_ignored_bulk_error(item):
+                raise BulkIndexError(
+                    'Не удалось загрузить документ в индекс.', [item]
+                )
+            # результаты выдаются в порядке следования команд, поэтому
+            # все вопросы с меньшими ключами уже загружены
+            last_id = int(item['index']['_id'])
+            indexed_count += 1
+            if indexed_count % const.QUESTION_REINDEX_CHECKPOINT_INTERVAL == 0:
+                self._set_checkpoint(index, last_id)
+                print(f'Загружено {indexed_count} вопросов '
+                      f'({indexed_count / (time.perf_counter() - start):.0f}'
+                      ' док/с)')
+        self._set_checkpoint(index, last_id)
+        self.es_client.indices.put_settings(
+            index=index,
+            settings={
+                'number_of_replicas': None,
+                'refresh_interval': None,
+                'gc_deletes': None,
+            }
+        )
+        self.es_client.indices.refresh(index=index)
+        self._switch_alias(index)
+        elapsed = time.perf_counter() - start
+        print(f'Загружено {indexed_count} вопросов за {elapsed:.1f} с '
+              f'({indexed_count / max(elapsed, 1e-9):.0f} док/с). '
+              f'Псевдоним {self.index} указывает на {index}')
+        return index
 
-    def export_data_from_db_to_index(self) -> None:
+    def sync_questions_in_index(self, question_ids: Iterable[int]) -> None:
         """
-        Экспортирует содержимое БД в индекс в несколько итераций.
+        Приводит документы вопросов с переданными ключами в соответствие
+        с БД запросами к bulk API: вопросы, разрешенные к выдаче,
+        добавляются в индекс или обновляются, остальные (в том числе
+        удаленные из БД) - удаляются из индекса. В индекс, переиндексация
+        в который не завершена, изменения записываются с внешней версией
+        документа (см. get_versioned_index_action). При ошибках индексации
+        вызывает исключение BulkIndexError.
         """
+        question_ids = set(question_ids)
+        unfinished_index = self._get_unfinished_index()
         with sync_session_factory() as session:
-            last_question_id = session.scalar(
-                select(Question.id)
-                .order_by(desc(Question.id))
-                .limit(1)
-            )
-        upload_intervals = [_ for _ in range(1, last_question_id + 1, 10000)]
-        upload_intervals.append(last_question_id)
-        self.remove_all_docs_from_index()
-        for i in range(len(upload_intervals) - 1):
-            try:
-                uploaded_questions = ElasticSearchQuestion.__prepare_questions(
-                    upload_intervals[i], upload_intervals[i + 1]
+            questions = session.execute(
+                get_question_rows_query()
+                .add_columns(Question.version)
+                .filter(
+                    Question.id.in_(question_ids),
+                    Question.is_condemned == false(),
+                    Question.is_published == true()
                 )
-                helpers.bulk(
-                    self.es_client, uploaded_questions, index=self.index
+            )
+            questions = questions.all()
+            deleted_ids = question_ids - {_.id for _ in questions}
+            # версии вопросов, которые не разрешены к выдаче, но не удалены
+            deleted_versions = {}
+            if unfinished_index is not None and deleted_ids:
+                deleted_versions = dict(session.execute(
+                    select(Question.id, Question.version)
+                    .filter(Question.id.in_(deleted_ids))
+                ).all())
+        actions = [
+            {'_index': self.index, '_id': question.id,
+             **get_question_document(question)}
+            for question in questions
+        ]
+        actions.extend(
+            {'_op_type': 'delete', '_index': self.index, '_id': question_id}
+            for question_id in deleted_ids
+        )
+        # изменения должны стать доступны поиску до увеличения версии
+        # содержимого Базы (см. drain_question_index_outbox)
+        _, errors = helpers.bulk(
+            self.es_client, actions, raise_on_error=False,
+            refresh='wait_for'
+        )
+        if unfinished_index is not None:
+            # обновление индекса отключено до завершения загрузки, поэтому
+            # ожидание обновления (refresh='wait_for') не выполняется
+            actions = [
+                get_versioned_index_action(unfinished_index, question)
+                for question in questions
+            ]
+            actions.extend(
+                get_versioned_delete_action(
+                    unfinished_index,
+                    question_id,
+                    deleted_versions.get(question_id)
                 )
-            except Exception as err:
-                self.remove_all_docs_from_index()
-                print((f'При экспорте данных произошла ошибка: {err}.'
-                       'Выполнена очистка индекса.'))
-                break
+                for question_id in deleted_ids
+            )
+            _, unfinished_index_errors = helpers.bulk(
+                self.es_client, actions, raise_on_error=False
+            )
+            errors.extend(unfinished_index_errors)
+        errors = [
+            error for error in errors if not is_ignored_bulk_error(error)
+        ]
+        if errors:
+            raise BulkIndexError(
+                f'{len(errors)} документ(ов) не удалось проиндексировать.',
+                errors
+            )
+
+
+class ElasticsearchUnavailableError(Exception):
+    """
+    Elasticsearch не ответил за отведенное время или вернул ошибку сервера,
+    либо обращения к нему прекращены предохранителем.
+    """
 
-    def search_questions(
+
+class CircuitBreaker:
+    """
+    Предохранитель обращений к Elasticsearch. После failure_threshold ошибок
+    подряд размыкается: обращения не выполняются, а сразу завершаются
+    исключением ElasticsearchUnavailableError. По истечении reset_timeout
+    пропускается одно пробное обращение: при успехе предохранитель
+    замыкается, при ошибке - снова размыкается, а если пробное обращение
+    отменено или завершилось непредвиденным исключением - следующее
+    обращение также становится пробным. Каждое обращение ограничено
+    по времени deadline.
+    """
+
+    CLOSED: str = 'closed'
+    OPEN: str = 'open'
+    HALF_OPEN: str = 'half_open'
+
+    # Значения метрики elasticsearch_breaker_state
+    STATE_METRIC_VALUES: dict[str, int] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+            self,
+            failure_threshold: int = (
+                const.ELASTICSEARCH_BREAKER_FAILURE_THRESHOLD
+            ),
+            reset_timeout: float = (
+                const.ELASTICSEARCH_BREAKER_RESET_TIMEOUT.total_seconds()
+            ),
+            deadline: float = const.ELASTICSEARCH_CALL_DEADLINE
+    ) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.deadline: float = deadline
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0
+        metrics.set('elasticsearch_breaker_state', 0)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.set(
+            'elasticsearch_breaker_state', self.STATE_METRIC_VALUES[state]
+        )
+
+    def _allow_call(self) -> bool:
+        """
+        Проверяет, можно ли выполнить обращение. В полуоткрытом состоянии
+        до завершения пробного обращения остальные обращения отклоняются.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if (
+            self.state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self._set_state(self.HALF_OPEN)
+            return True
+        return False
+
+    def _record_success(self) -> None:
+        self.failures = 0
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def _release_probe(self) -> None:
+        """
+        Возвращает предохранитель в разомкнутое состояние, не продлевая
+        его, если пробное обращение не дало результата.
+        """
+        if self.state == self.HALF_OPEN:
+            self._set_state(self.OPEN)
+
+    def _record_failure(self) -> None:
+        metrics.inc('elasticsearch_call_failures_total')
+        self.failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                metrics.inc('elasticsearch_breaker_opened_total')
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    async def call(
+            self,
+            func: Callable[..., Awaitable],
+            *args,
+            **kwargs
+    ) -> Any:
+        """
+        Выполняет обращение к Elasticsearch. Ошибки клиента (например,
+        некорректный запрос) не учитываются и передаются вызывающему коду.
+        """
+        if not self._allow_call():
+            metrics.inc('elasticsearch_breaker_rejections_total')
+            raise ElasticsearchUnavailableError('Предохранитель разомкнут.')
+        try:
+            async with asyncio.timeout(self.deadline):
+                result = await func(*args, **kwargs)
+        except (TimeoutError, TransportError) as error:
+            self._record_failure()
+            raise ElasticsearchUnavailableError(str(error)) from error
+        except ApiError as error:
+            if error.meta.status < 500 and error.meta.status != 429:
+                self._record_success()
+                raise
+            self._record_failure()
+            raise ElasticsearchUnavailableError(str(error)) from error
+        except BaseException:
+            # обращение отменено (например, клиент разорвал соединение)
+            # или завершилось ошибкой, не связанной с Elasticsearch
+            self._release_probe()
+            raise
+        self._record_success()
+        return result
+
+
+class AsyncElasticSearchQuestion:
+    """
+    Асинхронная работа с индексом вопросов при обработке запросов. Использует
+    общий для всех запросов клиент (см. get_async_es_client). Обращения
+    выполняются через предохранитель (см. CircuitBreaker).
+    """
+
+    def __init__(
+            self,
+            es_client: AsyncElasticsearch,
+            index: str = 'question_index'
+    ) -> None:
+        self.es_client: AsyncElasticsearch = es_client
+        self.index: str = index
+        self.breaker: CircuitBreaker = CircuitBreaker()
+
+    async def close(self) -> None:
+        """Закрывает соединения клиента."""
+        await self.es_client.close()
+
+    async def search_questions(
+            self,
+            search_pattern: str,
+            quantity: int,
+            question_type: str = None,
+            search_after: list | None = None,
+            stage: str = 'fuzzy',
+            facet_filters: dict[str, str] | None = None,
+            facet_fields: tuple[str, ...] = (),
+            excluded_stages: tuple[str, ...] = ()
+    ) -> ObjectApiResponse:
+        """
+        Поиск вопросов в индексе запросом ступени stage (см.
+        QUESTION_SEARCH_STAGES) без вопросов, найденных ступенями
+        excluded_stages. Для получения следующей страницы результатов
+        передается search_after - значения сортировки последнего вопроса
+        предыдущей страницы. Фасеты по полям facet_fields подсчитываются
+        в том же запросе.
+        """
+        body = dsl.get_searh_query(
+            search_pattern, question_type, search_after, stage,
+            facet_filters, facet_fields, excluded_stages
+        )
+        return await self.breaker.call(
+            self.es_client.search, index=self.index, size=quantity, body=body
+        )
+
+    async def substring_search_questions(
+            self,
+            search_pattern: str,
+            quantity: int,
+            question_type: str = None,
+            search_after: list | None = None
+    ) -> ObjectApiResponse:
+        """Поиск вопросов, текст которых содержит подстроку."""
+        body = dsl.get_substring_search_query(
+            search_pattern, question_type, search_after
+        )
+        return await self.breaker.call(
+            self.es_client.search, index=self.index, size=quantity, body=body
+        )
+
+    async def random_substring_search_questions(
             self,
             search_pattern: str,
             quantity: int,
             question_type: str = None
     ) -> ObjectApiResponse:
-        """Поиск вопросов в индексе."""
-        body = dsl.get_searh_query(search_pattern, question_type)
-        return self.es_client.search(
-            index=self.index, size=quantity, body=body
-        )
-
-    def get_questions_pk_list(
-            self, search_result: ObjectApiResponse
-    ) -> list[int]:
-        """
-        Возвращает список первичных ключей записей
-        на основании результата поиска в индексе.
-        """
-        return [_['_source']['pk'] for _ in search_result.body['hits']['hits']]
-
-    def add_or_update_question_in_index(self, question: Question) -> None:
-        """Обновляет документ в индексе или добавляет в индекс новый вопрос."""
-        question_export_data = {
-            'pk': question.id,
-            'question_type': question.question_type.value,
-            'question': question.question
-        }
-        question_doc = self.es_client.search(
-            index=self.index, body={'query': {'match': {'pk': question.id}}}
-        )
-        if not question_doc.body['hits']['hits']:
-            question_doc_id = None
-        else:
-            question_doc_id = question_doc.body['hits']['hits'][0]['_id']
-        self.es_client.index(
-            index=self.index, id=question_doc_id, document=question_export_data
-        )
-
-    def delete_question_from_index(self, question: Question) -> None:
-        """Удаляет вопрос из индекса, если он с нем присутствует."""
-        question_doc = self.es_client.search(
-            index=self.index, body={'query': {'match': {'pk': question.id}}}
-        )
-        if question_doc.body['hits']['hits']:
-            question_doc_id = question_doc.body['hits']['hits'][0]['_id']
-            self.es_client.delete(index=self.index, id=question_doc_id)
+        """
+        Случайная выборка из всех вопросов, текст которых содержит
+        подстроку.
+        """
+        body = dsl.get_random_substring_search_query(
+            search_pattern, question_type
+        )
+        return await self.breaker.call(
+            self.es_client.search, index=self.index, size=quantity, body=body
+        )
+
+    async def suggest_questions(
+            self,
+            prefix: str,
+            quantity: int,
+            question_type: str = None
+    ) -> ObjectApiResponse:
+        """
+        Поиск вопросов по началу текста (подсказки при наборе). Из документов
+        выбираются только первичный ключ и текст вопроса.
+        """
+        body = dsl.get_suggest_query(prefix, question_type)
+        return await self.breaker.call(
+            self.es_client.search, index=self.index, size=quantity, body=body
+        )
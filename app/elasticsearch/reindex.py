@@ -0,0 +1,23 @@
+"""
+Переиндексация вопросов без прерывания поиска: вопросы загружаются в новый
+версионный индекс, после чего псевдоним question_index атомарно
+переключается на него. Прерванная переиндексация при повторном запуске
+продолжается с места остановки.
+
+Запуск из корня репозитория:
+
+    python -m app.elasticsearch.reindex [--restart]
+"""
+import argparse
+
+from app.elasticsearch.logic import ElasticSearchQuestion
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='начать переиндексацию заново, удалив незавершенные индексы'
+    )
+    args = parser.parse_args()
+    ElasticSearchQuestion().reindex(resume=not args.restart)
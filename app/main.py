@@ -9,7 +9,10 @@ from starlette_wtf import CSRFProtectMiddleware
 from app.api.common_endpoints import router as common_endpints_router
 from app.api.questions import router as api_questions_router
 from app.api.users import router as users_router
-from app.core.config import settings, lifespan, limiter
+from app.core.compression import ETagGZipMiddleware
+from app.core.config import settings, limiter
+import app.core.constants as const
+from app.core.lifespan import lifespan
 from app.pages.common_pages import router as common_pages_router
 from app.pages.brain_system import router as brain_system_router
 from app.pages.error_handlers import custom_error_handlers
@@ -22,6 +25,11 @@ app_api = FastAPI(
     lifespan=lifespan
 )
 app_api.state.limiter = limiter
+app_api.add_middleware(
+    ETagGZipMiddleware,
+    minimum_size=const.GZIP_MINIMUM_SIZE,
+    compresslevel=const.GZIP_COMPRESS_LEVEL
+)
 app_api.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 app_api.include_router(api_questions_router)
@@ -33,6 +41,9 @@ app_pages = FastAPI(
     title=settings.app_pages_title,
     description=settings.app_pages_description,
     middleware=[
+        Middleware(ETagGZipMiddleware,
+                   minimum_size=const.GZIP_MINIMUM_SIZE,
+                   compresslevel=const.GZIP_COMPRESS_LEVEL),
         Middleware(SessionMiddleware,
                    secret_key=settings.session_middleware_secret_key),
         Middleware(CSRFProtectMiddleware,
@@ -41,6 +52,7 @@ app_pages = FastAPI(
     exception_handlers=custom_error_handlers,
     docs_url=None,
     redoc_url=None,
+    lifespan=lifespan
 )
 app_pages.state.limiter = limiter
 
@@ -1,7 +1,11 @@
+from datetime import datetime, timezone
 import enum
+import random
 from typing import Optional
 
-from sqlalchemy import ForeignKey, SmallInteger, String, Text
+from sqlalchemy import (DDL, DateTime, ForeignKey, Index, Integer,
+                        SmallInteger, String, Text, and_, column, event,
+                        false, func, literal_column, true)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -21,16 +25,57 @@ class QuestionType(enum.StrEnum):
     Я = 'Своя игра'
 
 
+# Условие частичных индексов: только вопросы, разрешенные к выдаче
+# (записывается так же, как фильтры запросов, иначе SQLite не использует
+# частичный индекс)
+ELIGIBLE_QUESTION_CLAUSE = and_(
+    column('is_published') == true(), column('is_condemned') == false()
+)
+
+
 class Question(Base):
     """Основная таблица с вопросами."""
+    __table_args__ = (
+        Index(
+            'ix_question_type_random_key', 'question_type', 'random_key',
+            postgresql_where=ELIGIBLE_QUESTION_CLAUSE,
+            sqlite_where=ELIGIBLE_QUESTION_CLAUSE,
+        ),
+        Index(
+            'ix_question_random_key', 'random_key',
+            postgresql_where=ELIGIBLE_QUESTION_CLAUSE,
+            sqlite_where=ELIGIBLE_QUESTION_CLAUSE,
+        ),
+        # Индексы с версиями вопросов: проверка актуальности ответа
+        # клиента (ETag) выполняется без обращения к таблице
+        Index(
+            'ix_question_id_version', 'id', 'version', 'updated_at',
+            postgresql_where=ELIGIBLE_QUESTION_CLAUSE,
+            sqlite_where=ELIGIBLE_QUESTION_CLAUSE,
+        ),
+        Index(
+            'ix_question_user_id_version',
+            'user_id', 'id', 'version', 'updated_at'
+        ),
+        # Индекс для выборки вопросов, измененных после обновления индекса
+        # первичных ключей в памяти процесса (см. QuestionIdIndex)
+        Index('ix_question_updated_at', 'updated_at'),
+        # Триграммный индекс для поиска подстроки (LIKE/ILIKE '%...%'),
+        # требует расширения pg_trgm; в SQLite не создается
+        Index(
+            'ix_question_question_trgm', 'question',
+            postgresql_using='gin',
+            postgresql_ops={'question': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
-    package: Mapped[str | None] = mapped_column(String(256))
+    package: Mapped[str | None] = mapped_column(String(256), index=True)
     tour: Mapped[str | None] = mapped_column(String(256))
     number: Mapped[int | None] = mapped_column(SmallInteger())
     question_type: Mapped[QuestionType] = mapped_column(
         default=QuestionType.Ч,
     )
-    question: Mapped[str] = mapped_column(Text(), index=True)
+    question: Mapped[str] = mapped_column(Text())
     answer: Mapped[str] = mapped_column(Text())
     pass_criteria: Mapped[str | None] = mapped_column(Text())
     authors: Mapped[str | None] = mapped_column(Text())
@@ -40,8 +85,99 @@ class Question(Base):
     угловые скобки, некодируемый набор символов и т.п."""
     is_condemned: Mapped[bool] = mapped_column(default=False)
     is_published: Mapped[bool] = mapped_column(default=False)
+    """Случайный ключ в диапазоне [0, 1) для выбора случайных вопросов
+    поиском по индексу."""
+    random_key: Mapped[float] = mapped_column(default=random.random)
+    """Номер версии вопроса, увеличивается при каждом изменении вопроса."""
+    version: Mapped[int] = mapped_column(Integer(), default=1)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
     user_id: Mapped[int | None] = mapped_column(ForeignKey('user.id'))
     user: Mapped[Optional['User']] = relationship(back_populates='questions')
 
     def __str__(self):
         return f'Вопрос id = {self.id}. Тип: {self.question_type.value} ...'
+
+
+class QuestionIndexOutbox(Base):
+    """
+    Очередь изменений вопросов для синхронизации поискового индекса.
+    Записи добавляются в одной транзакции с изменением вопроса и переносятся
+    в индекс задачей Celery. Внешний ключ не используется: удаленный вопрос
+    также должен быть удален из индекса.
+    """
+    id: Mapped[int] = mapped_column(primary_key=True)
+    question_id: Mapped[int] = mapped_column(Integer())
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __str__(self):
+        return f'Изменение вопроса id = {self.question_id}'
+
+
+# Полнотекстовый индекс SQLite FTS5 по тексту вопросов (используется
+# поисковым движком sqlite_fts). Индекс хранит только токены, а текст
+# берет из таблицы вопросов; синхронизация выполняется триггерами.
+QUESTION_FTS_DDL: tuple[str, ...] = (
+    "CREATE VIRTUAL TABLE question_fts USING fts5(question, "
+    "content='question', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER question_fts_insert AFTER INSERT ON question BEGIN "
+    "INSERT INTO question_fts(rowid, question) "
+    "VALUES (new.id, new.question); END",
+    "CREATE TRIGGER question_fts_delete AFTER DELETE ON question BEGIN "
+    "INSERT INTO question_fts(question_fts, rowid, question) "
+    "VALUES ('delete', old.id, old.question); END",
+    "CREATE TRIGGER question_fts_update AFTER UPDATE OF question "
+    "ON question BEGIN "
+    "INSERT INTO question_fts(question_fts, rowid, question) "
+    "VALUES ('delete', old.id, old.question); "
+    "INSERT INTO question_fts(rowid, question) "
+    "VALUES (new.id, new.question); END",
+)
+
+for statement in QUESTION_FTS_DDL:
+    event.listen(
+        Question.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite')
+    )
+event.listen(
+    Question.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS question_fts').execute_if(dialect='sqlite')
+)
+
+
+class QuestionCatalog(Base):
+    """
+    Каталог пакетов вопросов: количество вопросов, разрешенных к выдаче,
+    и туров в каждом пакете с разбивкой по типам вопросов. Актуализируется
+    при каждом изменении вопросов.
+    """
+    __table_args__ = (
+        Index('ix_questioncatalog_type_package', 'question_type', 'package'),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    package: Mapped[str | None] = mapped_column(String(256))
+    question_type: Mapped[QuestionType]
+    question_count: Mapped[int] = mapped_column(Integer())
+    tour_count: Mapped[int] = mapped_column(Integer())
+    min_question_id: Mapped[int] = mapped_column(Integer())
+    max_question_id: Mapped[int] = mapped_column(Integer())
+
+    def __str__(self):
+        return f'Пакет "{self.package}". Тип: {self.question_type.value}'
+
+
+# Уникальный индекс пар (пакет, тип вопроса) каталога. Вопросы без пакета
+# образуют одну запись для каждого типа, поэтому пакет NULL индексируется
+# как пустая строка
+QuestionCatalogKeyIndex = Index(
+    'uq_questioncatalog_package_type',
+    func.coalesce(QuestionCatalog.package, literal_column("''")),
+    QuestionCatalog.question_type,
+    unique=True,
+)
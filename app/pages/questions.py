@@ -1,5 +1,3 @@
-import random
-
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette_wtf import csrf_protect
@@ -7,13 +5,11 @@ from starlette_wtf import csrf_protect
 from app.core.config import limiter, templates
 import app.core.constants as const
 from app.core.db import get_async_session
-from app.crud.questions_api import get_questions_by_list_order
-from app.crud.questions_pages import (get_base_query,
-                                      get_initial_random_question_set,
-                                      get_random_package)
-from app.elasticsearch.logic import ElasticSearchQuestion
-from app.models.questions import Question
+from app.crud.questions_pages import (get_random_package,
+                                      get_random_question_set)
 from app.pages.forms import RandomPackageForm, RandomQuestionForm
+from app.search.base import SearchBackend
+from app.search.dependencies import get_search_backend
 
 router = APIRouter(
     prefix='/questions',
@@ -27,7 +23,8 @@ router = APIRouter(
 @limiter.limit(const.GENERATE_QUESTIONS_THROTTLING_RATE)
 async def random_questions(
     request: Request,
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_async_session),
+    search_backend: SearchBackend = Depends(get_search_backend)
 ):
     form = await RandomQuestionForm.from_formdata(request)
     context = {'form': form, 'form_is_valid': False}
@@ -36,34 +33,32 @@ async def random_questions(
         if await form.validate_on_submit():
             context['form_is_valid'] = True
             if form.full_text_search_pattern.data:
-                es = ElasticSearchQuestion()
-                search_result = es.search_questions(
+                page = await search_backend.search_questions(
+                    session,
                     form.full_text_search_pattern.data,
                     form.questions_quantity.data,
                     dict(
                         form.question_type.choices
                     ).get(form.question_type.data)
                 )
-                question_pk_list = es.get_questions_pk_list(search_result)
-                questions = await get_questions_by_list_order(
-                    question_pk_list, session
+                questions = page.questions
+            elif form.search_pattern.data:
+                questions = (
+                    await search_backend.random_substring_search_questions(
+                        session,
+                        form.search_pattern.data,
+                        form.questions_quantity.data,
+                        dict(
+                            form.question_type.choices
+                        ).get(form.question_type.data)
+                    )
                 )
             else:
-                if form.search_pattern.data:
-                    query = get_base_query(form.question_type.data).filter(
-                        Question.question.contains(form.search_pattern.data)
-                    )
-                    questions = await session.execute(query)
-                    questions = questions.all()
-                else:
-                    questions = await get_initial_random_question_set(
-                        form.question_type.data, session
-                    )
-                questions_quantity = min(
+                questions = await get_random_question_set(
+                    form.question_type.data,
                     form.questions_quantity.data,
-                    len(questions)
+                    session
                 )
-                questions = random.choices(questions, k=questions_quantity)
             context['questions'] = questions
     return templates.TemplateResponse(
         request=request,
@@ -0,0 +1,63 @@
+"""
+Предварительное сжатие статических файлов: рядом с каждым файлом, формат
+которого хорошо сжимается, создается файл <имя>.gz, который nginx отдает
+вместо исходного (gzip_static), не сжимая файл при каждом запросе.
+Выполняется при сборке образа backend_pages.
+
+Запуск из корня репозитория:
+
+    python -m app.precompress_static [--static-dir app/static]
+"""
+import argparse
+import gzip
+import os
+from pathlib import Path
+
+# Расширения файлов, которые сжимаются (остальные форматы - изображения,
+# архивы, PDF - уже сжаты)
+COMPRESSIBLE_EXTENSIONS: frozenset[str] = frozenset(
+    ('.css', '.js', '.svg', '.ico', '.html', '.txt', '.json', '.stl')
+)
+
+# Файлы меньшего размера (в байтах) не сжимаются
+MIN_FILE_SIZE: int = 1000
+
+
+def precompress_file(path: Path) -> bool:
+    """
+    Создает сжатую копию файла, если она меньше исходного файла. Время
+    изменения копии совпадает с исходным, поэтому nginx формирует для них
+    одинаковые заголовки Last-Modified.
+    """
+    content = path.read_bytes()
+    compressed_content = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(compressed_content) >= len(content):
+        return False
+    compressed_path = path.with_name(f'{path.name}.gz')
+    compressed_path.write_bytes(compressed_content)
+    stat = path.stat()
+    os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return True
+
+
+def precompress_static(static_dir: Path) -> None:
+    total_size = compressed_size = 0
+    for path in sorted(static_dir.rglob('*')):
+        if (
+            not path.is_file()
+            or path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS
+            or path.stat().st_size < MIN_FILE_SIZE
+        ):
+            continue
+        if precompress_file(path):
+            total_size += path.stat().st_size
+            compressed_size += path.with_name(f'{path.name}.gz').stat().st_size
+    print(f'Сжато файлов общим размером {total_size // 1024} КБ, '
+          f'размер сжатых копий - {compressed_size // 1024} КБ')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--static-dir', type=Path, default=Path('app/static'))
+    args = parser.parse_args()
+    precompress_static(args.static_dir)
@@ -22,6 +22,21 @@ class QuestionDB(BaseModel):
         from_attributes = True
 
 
+class FacetBucket(BaseModel):
+    value: str
+    count: int
+
+
+class QuestionSearchResult(BaseModel):
+    questions: list[QuestionDB]
+    facets: dict[str, list[FacetBucket]]
+
+
+class QuestionSuggestion(BaseModel):
+    id: int
+    question: str
+
+
 class QuestionDBWithStatus(QuestionDB):
     is_condemned: bool
     is_published: bool
@@ -0,0 +1,261 @@
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.crud.questions_api import get_questions_by_substring
+
+
+def get_question_snippet(question: str) -> str:
+    """
+    Возвращает начало текста вопроса длиной не более QUESTION_SNIPPET_LENGTH
+    символов, обрезанное по границе слова.
+    """
+    if len(question) <= const.QUESTION_SNIPPET_LENGTH:
+        return question
+    snippet = question[:const.QUESTION_SNIPPET_LENGTH].rsplit(maxsplit=1)[0]
+    return f'{snippet}…'
+
+
+class SearchBackendUnavailableError(Exception):
+    """Поисковый движок не отвечает или обращения к нему прекращены."""
+
+
+class SearchPage(NamedTuple):
+    """
+    Страница результатов поиска: вопросы в виде словарей с полями схемы
+    QuestionDB, ключ сортировки последнего вопроса, который передается
+    в search_after для получения следующей страницы (None, если следующей
+    страницы нет), название ступени поиска, давшей результат, и фасеты -
+    количества найденных вопросов по значениям полей QUESTION_FACET_FIELDS
+    (если запрошены).
+    """
+    questions: list[dict[str, Any]]
+    next_search_after: list | None
+    stage: str | None = None
+    facets: dict[str, list[dict[str, Any]]] | None = None
+
+
+class SearchBackend(ABC):
+    """
+    Базовый класс поискового движка, выполняющего полнотекстовый и нечеткий
+    поиск по тексту вопросов. Индекс синхронизируется с БД вне обработки
+    запросов (см. QuestionIndexOutbox).
+
+    Полнотекстовый поиск выполняется ступенями search_stages - от точных
+    и дешевых запросов к более широким и дорогим: следующая ступень
+    выполняется, только если предыдущая нашла меньше вопросов, чем
+    требуется. Если движок недоступен, выполняется резервная ступень
+    FALLBACK_STAGE - поиск по подстроке в БД.
+    """
+
+    search_stages: tuple[str, ...]
+
+    FALLBACK_STAGE: str = 'fallback'
+
+    async def close(self) -> None:
+        """Освобождает ресурсы движка при остановке приложения."""
+
+    @abstractmethod
+    async def search_questions_at_stage(
+            self,
+            session: AsyncSession,
+            stage: str,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None,
+            with_facets: bool = False,
+            excluded_stages: tuple[str, ...] = ()
+    ) -> SearchPage:
+        """
+        Выполняет одну ступень полнотекстового поиска. Возвращает найденные
+        вопросы, разрешенные к выдаче, в порядке убывания релевантности
+        (при равной релевантности - по возрастанию первичного ключа)
+        и ключ сортировки последнего вопроса либо None, если следующей
+        страницы нет. Тип вопроса передается в виде полного названия
+        (значения QuestionType), facet_filters - точные значения полей
+        package и authors. Если with_facets - подсчитываются фасеты.
+        Вопросы, найденные ступенями excluded_stages, не выдаются.
+        """
+
+    async def search_questions(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None,
+            with_facets: bool = False
+    ) -> SearchPage:
+        """
+        Полнотекстовый поиск вопросов. Первой страницей является результат
+        первой ступени, нашедшей не меньше quantity вопросов, либо последней
+        ступени. Следующие страницы выбираются той же ступенью, а когда
+        ее результаты исчерпаны - следующими ступенями без вопросов,
+        найденных предыдущими, поэтому набор найденных вопросов не зависит
+        от размера страницы. Первые элементы ключа сортировки - номера
+        ступени первой страницы и текущей ступени (номер резервной ступени
+        равен количеству ступеней search_stages). Если движок
+        недоступен при получении следующей страницы ступени движка,
+        вызывается исключение SearchBackendUnavailableError: резервная
+        ступень выдает вопросы в другом порядке, и выдача началась бы
+        заново.
+        """
+        fallback_stage_index = len(self.search_stages)
+        if search_after is None or search_after[1] != fallback_stage_index:
+            try:
+                return await self._search_questions_by_stages(
+                    session, search_pattern, quantity, question_type,
+                    search_after, facet_filters, with_facets
+                )
+            except SearchBackendUnavailableError:
+                if search_after is not None:
+                    raise
+                metrics.inc('question_search_fallbacks_total')
+        page = await self.search_questions_in_db(
+            session, search_pattern, quantity, question_type,
+            search_after, facet_filters
+        )
+        next_search_after = page.next_search_after
+        if next_search_after is not None:
+            # релевантность при поиске по подстроке не вычисляется
+            next_search_after = [
+                fallback_stage_index, fallback_stage_index, 0,
+                *next_search_after
+            ]
+        return page._replace(
+            next_search_after=next_search_after,
+            stage=self.FALLBACK_STAGE,
+            facets=(
+                {field: [] for field in const.QUESTION_FACET_FIELDS}
+                if with_facets else None
+            )
+        )
+
+    async def _search_questions_by_stages(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None,
+            with_facets: bool = False
+    ) -> SearchPage:
+        if search_after is None:
+            for stage_index, stage in enumerate(self.search_stages):
+                page = await self.search_questions_at_stage(
+                    session, stage, search_pattern, quantity, question_type,
+                    None, facet_filters, with_facets
+                )
+                if len(page.questions) >= quantity:
+                    break
+            first_stage_index = stage_index
+        else:
+            first_stage_index, stage_index, *search_after = search_after
+            stage = self.search_stages[stage_index]
+            page = await self.search_questions_at_stage(
+                session, stage, search_pattern, quantity, question_type,
+                search_after, facet_filters, with_facets,
+                self.search_stages[first_stage_index:stage_index]
+            )
+        questions, facets = page.questions, page.facets
+        while (
+            len(questions) < quantity
+            and stage_index + 1 < len(self.search_stages)
+        ):
+            # результаты ступени исчерпаны: страница дополняется вопросами
+            # следующей ступени, не найденными ступенями предыдущих страниц
+            stage_index += 1
+            stage = self.search_stages[stage_index]
+            page = await self.search_questions_at_stage(
+                session, stage, search_pattern, quantity - len(questions),
+                question_type, None, facet_filters, False,
+                self.search_stages[first_stage_index:stage_index]
+            )
+            questions = questions + page.questions
+        next_search_after = page.next_search_after
+        if next_search_after is not None:
+            next_search_after = [
+                first_stage_index, stage_index, *next_search_after
+            ]
+        return SearchPage(questions, next_search_after, stage, facets)
+
+    async def substring_search_questions(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None
+    ) -> SearchPage:
+        """
+        Возвращает вопросы, разрешенные к выдаче, текст которых содержит
+        подстроку (без учета регистра), по возрастанию первичного ключа.
+        По умолчанию выполняется просмотром таблицы вопросов в БД.
+        """
+        return await self.search_questions_in_db(
+            session, search_pattern, quantity, question_type, search_after
+        )
+
+    async def random_substring_search_questions(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Возвращает случайную выборку из всех вопросов, разрешенных к выдаче,
+        текст которых содержит подстроку (без учета регистра). По умолчанию
+        выполняется просмотром таблицы вопросов в БД.
+        """
+        questions = await get_questions_by_substring(
+            session, search_pattern, quantity, question_type,
+            random_order=True
+        )
+        return [_._asdict() for _ in questions]
+
+    async def search_questions_in_db(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None
+    ) -> SearchPage:
+        """
+        Поиск по подстроке просмотром таблицы вопросов в БД. Последний
+        элемент search_after - первичный ключ последнего выданного вопроса.
+        """
+        after_id = search_after[-1] if search_after is not None else None
+        questions = await get_questions_by_substring(
+            session, search_pattern, quantity, question_type, after_id,
+            facet_filters
+        )
+        questions = [_._asdict() for _ in questions]
+        if len(questions) < quantity:
+            return SearchPage(questions, None)
+        return SearchPage(questions, [questions[-1]['id']])
+
+    @abstractmethod
+    async def suggest_questions(
+            self,
+            session: AsyncSession,
+            prefix: str,
+            quantity: int,
+            question_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Возвращает подсказки для начала текста, набираемого пользователем:
+        наиболее релевантные вопросы, разрешенные к выдаче, в которых
+        встречаются все слова prefix (последнее - как начало слова),
+        в виде словарей с первичным ключом (id) и фрагментом текста вопроса
+        (question, см. get_question_snippet).
+        """
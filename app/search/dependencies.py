@@ -0,0 +1,26 @@
+from fastapi import Request
+
+from app.core.config import settings
+from app.elasticsearch.logic import (AsyncElasticSearchQuestion,
+                                     get_async_es_client)
+from app.search.base import SearchBackend
+from app.search.elastic import ElasticSearchBackend
+from app.search.sqlite_fts import SQLiteFTSBackend
+
+
+def create_search_backend() -> SearchBackend:
+    """
+    Создает поисковый движок, заданный в параметре SEARCH_BACKEND:
+    "elasticsearch" или "sqlite_fts" (только при DATABASE_TYPE=sqlite).
+    Вызывается один раз при запуске приложения.
+    """
+    if settings.search_backend == 'sqlite_fts':
+        return SQLiteFTSBackend()
+    return ElasticSearchBackend(
+        AsyncElasticSearchQuestion(get_async_es_client())
+    )
+
+
+def get_search_backend(request: Request) -> SearchBackend:
+    """Возвращает поисковый движок, созданный при запуске приложения."""
+    return request.app.state.search_backend
@@ -0,0 +1,124 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.constants as const
+from app.core.metrics import metrics
+from app.elasticsearch.logic import (AsyncElasticSearchQuestion,
+                                     ElasticsearchUnavailableError,
+                                     get_facets_from_search_result,
+                                     get_next_search_after,
+                                     get_questions_from_search_result)
+from app.elasticsearch.dsl_queries import QUESTION_SEARCH_STAGES
+from app.search.base import (SearchBackend, SearchBackendUnavailableError,
+                             SearchPage, get_question_snippet)
+
+
+class ElasticSearchBackend(SearchBackend):
+    """
+    Поиск вопросов по индексу Elasticsearch. Найденные вопросы выдаются
+    из содержимого документов индекса без обращения к БД. Поиск по подстроке
+    выполняется по подполю question.wildcard. При недоступности Elasticsearch
+    (см. CircuitBreaker) поиск выполняется просмотром таблицы вопросов в БД,
+    а подсказки не выдаются.
+    """
+
+    def __init__(self, es: AsyncElasticSearchQuestion) -> None:
+        self.es: AsyncElasticSearchQuestion = es
+
+    async def close(self) -> None:
+        await self.es.close()
+
+    search_stages = QUESTION_SEARCH_STAGES
+
+    async def search_questions_at_stage(
+            self,
+            session: AsyncSession,
+            stage: str,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None,
+            with_facets: bool = False,
+            excluded_stages: tuple[str, ...] = ()
+    ) -> SearchPage:
+        try:
+            search_result = await self.es.search_questions(
+                search_pattern, quantity, question_type, search_after, stage,
+                facet_filters,
+                const.QUESTION_FACET_FIELDS if with_facets else (),
+                excluded_stages
+            )
+        except ElasticsearchUnavailableError as error:
+            raise SearchBackendUnavailableError from error
+        return SearchPage(
+            get_questions_from_search_result(search_result),
+            get_next_search_after(search_result, quantity),
+            facets=(
+                get_facets_from_search_result(search_result)
+                if with_facets else None
+            )
+        )
+
+    async def substring_search_questions(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None
+    ) -> SearchPage:
+        try:
+            search_result = await self.es.substring_search_questions(
+                search_pattern, quantity, question_type, search_after
+            )
+        except ElasticsearchUnavailableError:
+            metrics.inc('question_substring_search_fallbacks_total')
+            return await super().substring_search_questions(
+                session, search_pattern, quantity, question_type, search_after
+            )
+        return SearchPage(
+            get_questions_from_search_result(search_result),
+            get_next_search_after(search_result, quantity)
+        )
+
+    async def random_substring_search_questions(
+            self,
+            session: AsyncSession,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        try:
+            search_result = await self.es.random_substring_search_questions(
+                search_pattern, quantity, question_type
+            )
+        except ElasticsearchUnavailableError:
+            metrics.inc('question_substring_search_fallbacks_total')
+            return await super().random_substring_search_questions(
+                session, search_pattern, quantity, question_type
+            )
+        return get_questions_from_search_result(search_result)
+
+    async def suggest_questions(
+            self,
+            session: AsyncSession,
+            prefix: str,
+            quantity: int,
+            question_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        try:
+            search_result = await self.es.suggest_questions(
+                prefix, quantity, question_type
+            )
+        except ElasticsearchUnavailableError:
+            metrics.inc('question_suggest_fallbacks_total')
+            return []
+        return [
+            {
+                'id': _['_source']['pk'],
+                'question': get_question_snippet(_['_source']['question'])
+            }
+            for _ in search_result.body['hits']['hits']
+        ]
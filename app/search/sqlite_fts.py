@@ -0,0 +1,240 @@
+import re
+from typing import Any
+
+from sqlalchemy import (and_, column, false, func, literal_column, or_, select,
+                        table, true)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.core.constants as const
+from app.crud.questions_api import get_question_rows_query
+from app.models.questions import Question, QuestionType
+from app.search.base import SearchBackend, SearchPage, get_question_snippet
+
+# Окончания русских слов, отбрасываемые перед поиском по префиксу
+# (упрощенный стемминг: "вопросы" -> "вопрос*")
+RUSSIAN_WORD_ENDINGS: tuple[str, ...] = tuple(sorted(
+    (
+        'иями', 'ями', 'ами', 'ией', 'иях', 'ого', 'его', 'ому', 'ему', 'ыми',
+        'ими', 'ой', 'ей', 'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие',
+        'ую', 'юю', 'ом', 'ем', 'ам', 'ям', 'ах', 'ях', 'ов', 'ев', 'ия',
+        'ью', 'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+    ),
+    key=len,
+    reverse=True
+))
+
+# Минимальная длина основы слова после отбрасывания окончания
+MIN_WORD_STEM_LENGTH: int = 3
+
+question_fts = table('question_fts', column('rowid'))
+
+
+def get_word_stem(word: str) -> str:
+    """Отбрасывает окончание слова, если основа не становится короче
+    MIN_WORD_STEM_LENGTH."""
+    for ending in RUSSIAN_WORD_ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_WORD_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def get_words(text: str) -> list[str]:
+    """Выделяет из текста неповторяющиеся слова в нижнем регистре."""
+    return list(dict.fromkeys(re.findall(r'[^\W_]+', text.lower())))
+
+
+def get_fts_query(search_pattern: str) -> str | None:
+    """
+    Формирует запрос FTS5: основы слов ищутся по префиксу и объединяются
+    через OR, так что вопросы, содержащие больше слов из запроса, получают
+    более высокий ранг. Если в запросе нет слов - возвращает None.
+    """
+    words = get_words(search_pattern)
+    if not words:
+        return None
+    return ' OR '.join(f'"{get_word_stem(word)}"*' for word in words)
+
+
+def get_fts_phrase_query(search_pattern: str) -> str | None:
+    """
+    Формирует запрос FTS5 на точное совпадение фразы: слова запроса должны
+    следовать в тексте вопроса подряд. Если в запросе нет слов - возвращает
+    None.
+    """
+    words = re.findall(r'[^\W_]+', search_pattern.lower())
+    if not words:
+        return None
+    return f'"{" ".join(words)}"'
+
+
+def get_stage_fts_query(search_pattern: str, stage: str) -> str | None:
+    """Формирует запрос FTS5 ступени поиска stage."""
+    if stage == 'phrase':
+        return get_fts_phrase_query(search_pattern)
+    return get_fts_query(search_pattern)
+
+
+def get_fts_prefix_query(prefix: str) -> str | None:
+    """
+    Формирует запрос FTS5 для подсказок: все слова ищутся по префиксу без
+    отбрасывания окончаний и объединяются через AND. Если в запросе нет
+    слов - возвращает None.
+    """
+    words = get_words(prefix)
+    if not words:
+        return None
+    return ' AND '.join(f'"{word}"*' for word in words)
+
+
+async def get_facets(
+        session: AsyncSession,
+        conditions: list
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Подсчитывает количество вопросов, удовлетворяющих условиям поиска,
+    по значениям полей QUESTION_FACET_FIELDS (по одному запросу GROUP BY
+    на поле).
+    """
+    facets = {}
+    for field in const.QUESTION_FACET_FIELDS:
+        column_ = getattr(Question, field)
+        buckets = await session.execute(
+            select(column_, func.count().label('count'))
+            .join(question_fts, question_fts.c.rowid == Question.id)
+            .filter(*conditions, column_.is_not(None))
+            .group_by(column_)
+            .order_by(func.count().desc(), column_)
+            .limit(const.QUESTION_FACET_SIZE)
+        )
+        facets[field] = [
+            {
+                'value': (
+                    value.value if isinstance(value, QuestionType) else value
+                ),
+                'count': count
+            }
+            for value, count in buckets.all()
+        ]
+    return facets
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Поиск вопросов по полнотекстовому индексу SQLite FTS5 (таблица
+    question_fts, синхронизируемая с таблицей вопросов триггерами, см.
+    QUESTION_FTS_DDL). Результаты ранжируются функцией bm25, найденные
+    вопросы выбираются тем же запросом, что и их ключи. Следующая страница
+    результатов выбирается по ключу (ранг, первичный ключ) последнего
+    вопроса предыдущей страницы. Нечеткий поиск FTS5 не поддерживает,
+    поэтому ступеней поиска две: точное совпадение фразы и совпадение
+    основ слов (см. get_fts_query).
+    """
+
+    search_stages = ('phrase', 'stemmed')
+
+    async def search_questions_at_stage(
+            self,
+            session: AsyncSession,
+            stage: str,
+            search_pattern: str,
+            quantity: int,
+            question_type: str | None = None,
+            search_after: list | None = None,
+            facet_filters: dict[str, str] | None = None,
+            with_facets: bool = False,
+            excluded_stages: tuple[str, ...] = ()
+    ) -> SearchPage:
+        fts_query = get_stage_fts_query(search_pattern, stage)
+        if fts_query is None:
+            return SearchPage([], None, facets=(
+                {field: [] for field in const.QUESTION_FACET_FIELDS}
+                if with_facets else None
+            ))
+        conditions = [
+            literal_column('question_fts').op('MATCH')(fts_query),
+            Question.is_condemned == false(),
+            Question.is_published == true()
+        ]
+        if question_type:
+            conditions.append(
+                Question.question_type == QuestionType(question_type)
+            )
+        conditions.extend(
+            getattr(Question, field) == value
+            for field, value in (facet_filters or {}).items()
+        )
+        conditions.extend(
+            Question.id.not_in(
+                select(question_fts.c.rowid).where(
+                    literal_column('question_fts').op('MATCH')(
+                        excluded_fts_query
+                    )
+                )
+            )
+            for excluded_fts_query in (
+                get_stage_fts_query(search_pattern, excluded_stage)
+                for excluded_stage in excluded_stages
+            )
+            if excluded_fts_query is not None
+        )
+        rank = func.bm25(literal_column('question_fts'))
+        query = (
+            get_question_rows_query()
+            .add_columns(rank.label('rank'))
+            .join(question_fts, question_fts.c.rowid == Question.id)
+            .filter(*conditions)
+        )
+        if search_after is not None:
+            last_rank, last_id = search_after
+            query = query.filter(or_(
+                rank > last_rank,
+                and_(rank == last_rank, Question.id > last_id)
+            ))
+        questions = await session.execute(
+            query.order_by(rank, Question.id).limit(quantity)
+        )
+        questions = [_._asdict() for _ in questions.all()]
+        next_search_after = None
+        if len(questions) == quantity:
+            next_search_after = [questions[-1]['rank'], questions[-1]['id']]
+        for question in questions:
+            del question['rank']
+        facets = None
+        if with_facets:
+            facets = await get_facets(session, conditions)
+        return SearchPage(questions, next_search_after, facets=facets)
+
+    async def suggest_questions(
+            self,
+            session: AsyncSession,
+            prefix: str,
+            quantity: int,
+            question_type: str | None = None
+    ) -> list[dict[str, Any]]:
+        fts_query = get_fts_prefix_query(prefix)
+        if fts_query is None:
+            return []
+        query = (
+            select(Question.id, Question.question)
+            .join(question_fts, question_fts.c.rowid == Question.id)
+            .filter(
+                literal_column('question_fts').op('MATCH')(fts_query),
+                Question.is_condemned == false(),
+                Question.is_published == true()
+            )
+        )
+        if question_type:
+            query = query.filter(
+                Question.question_type == QuestionType(question_type)
+            )
+        questions = await session.execute(
+            query.order_by(func.bm25(literal_column('question_fts')))
+            .limit(quantity)
+        )
+        return [
+            {'id': _.id, 'question': get_question_snippet(_.question)}
+            for _ in questions.all()
+        ]
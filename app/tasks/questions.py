@@ -4,14 +4,25 @@ from typing import List
 
 from celery import Celery
 from celery.schedules import crontab
+from elastic_transport import TransportError
+from elasticsearch.helpers import BulkIndexError
+from redis import Redis
 
 from app.api.utils import get_email_msg, get_package_file, send_email_message
 from app.core.config import settings
+import app.core.constants as const
+from app.core.db import sync_session_factory
 from app.crud.questions_api import get_unpublished_questions_num
+from app.crud.questions_catalog import get_catalog_refresh_statements
+from app.crud.questions_counters import QUESTION_COUNTERS_KEY
+from app.crud.questions_outbox import (delete_question_index_outbox_records,
+                                       get_question_index_outbox_batch)
+from app.crud.questions_pool import refill_question_pool
+from app.crud.questions_search_cache import QUESTION_CORPUS_VERSION_KEY
+from app.elasticsearch.logic import ElasticSearchQuestion
 
 
-broker_url = (f'redis://:{settings.redis_password}@{settings.redis_host}:'
-              f'{settings.redis_port}/0')
+broker_url = f'{settings.redis_url}/0'
 
 celery_api = Celery(
     'api_tasks',
@@ -31,6 +42,19 @@ def setup_periodic_tasks(sender, **kwargs):
         crontab(hour=10, minute=00),
         send_unpublished_questions_num.s(settings.smtp_host_user)
     )
+    sender.add_periodic_task(
+        crontab(hour=4, minute=00),
+        rebuild_question_catalog.s()
+    )
+    sender.add_periodic_task(
+        const.QUESTION_POOL_REFILL_INTERVAL.total_seconds(),
+        refill_question_pools.s()
+    )
+    if settings.search_backend == 'elasticsearch':
+        sender.add_periodic_task(
+            const.QUESTION_INDEX_OUTBOX_DRAIN_INTERVAL.total_seconds(),
+            drain_question_index_outbox.s()
+        )
 
 
 @celery_api.task
@@ -54,3 +78,68 @@ def send_email(
     package_file = get_package_file(package_questions_list, package_name)
     email_msg = get_email_msg(email_to, package_file, package_name)
     send_email_message(email_msg)
+
+
+@celery_api.task
+def refill_question_pools() -> None:
+    """Пополняет пулы случайных вопросов, опустевшие ниже порогового уровня."""
+    with (
+        Redis.from_url(settings.redis_url) as redis,
+        sync_session_factory() as session
+    ):
+        for question_type in const.QUESTION_POOL_TYPES:
+            refill_question_pool(session, redis, question_type)
+
+
+@celery_api.task
+def rebuild_question_catalog() -> None:
+    """
+    Полностью перестраивает каталог пакетов вопросов и сбрасывает общие
+    счетчики вопросов, чтобы они были пересчитаны по новому каталогу.
+    """
+    with sync_session_factory() as session:
+        for statement in get_catalog_refresh_statements():
+            session.execute(statement)
+        session.commit()
+    with Redis.from_url(settings.redis_url) as redis:
+        redis.delete(QUESTION_COUNTERS_KEY)
+
+
+@celery_api.task(
+    autoretry_for=(TransportError, BulkIndexError),
+    retry_backoff=True,
+    max_retries=const.QUESTION_INDEX_OUTBOX_MAX_RETRIES
+)
+def drain_question_index_outbox() -> None:
+    """
+    Переносит изменения вопросов из очереди QuestionIndexOutbox в индекс
+    Elasticsearch порциями через bulk API. Записи удаляются из очереди
+    только после успешной индексации, поэтому при недоступности
+    Elasticsearch изменения не теряются. После переноса изменений (в том
+    числе части изменений, если перенос прерван ошибкой) увеличивается
+    версия содержимого Базы, чтобы результаты поиска, сохраненные
+    до обновления индекса, перестали использоваться.
+    """
+    es = ElasticSearchQuestion()
+    is_synced = False
+    try:
+        with sync_session_factory() as session:
+            while True:
+                records = get_question_index_outbox_batch(
+                    session, const.QUESTION_INDEX_OUTBOX_BATCH_SIZE
+                )
+                if not records:
+                    break
+                es.sync_questions_in_index(_.question_id for _ in records)
+                delete_question_index_outbox_records(
+                    session, [_.id for _ in records]
+                )
+                session.commit()
+                is_synced = True
+                if len(records) < const.QUESTION_INDEX_OUTBOX_BATCH_SIZE:
+                    break
+    finally:
+        es.es_client.close()
+        if is_synced:
+            with Redis.from_url(settings.redis_url) as redis:
+                redis.incr(QUESTION_CORPUS_VERSION_KEY)
@@ -0,0 +1,145 @@
+"""
+Сравнение затрат процессорного времени и памяти на формирование ответа
+списочных эндпойнтов API при загрузке объектов модели Question с последующей
+валидацией по схеме QuestionDB и при загрузке только полей схемы QuestionDB
+(см. get_question_rows_query), а также при сериализации ответа стандартным
+модулем json (JSONResponse) и библиотекой orjson (ORJSONResponse, включается
+параметром ORJSON_RESPONSES). Перед измерением проверяется, что все способы
+формируют одинаковые ответы.
+
+Запуск из корня репозитория (переменные окружения приложения должны быть
+заданы так же, как для тестов):
+
+    python -m benchmarks.question_rows --rows 100 --requests 200
+"""
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+import tracemalloc
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from app.api.utils import get_questions_content
+from app.core.base import Base
+from app.crud.questions_api import get_question_rows_query
+from app.models.questions import Question, QuestionType
+from app.schemas.questions import QuestionDB
+
+QUESTIONS_ADAPTER = TypeAdapter(list[QuestionDB])
+
+
+async def get_orm_response(session: AsyncSession, quantity: int) -> bytes:
+    """Прежний способ: объекты модели и валидация по response_model."""
+    questions = await session.execute(select(Question).limit(quantity))
+    questions = QUESTIONS_ADAPTER.validate_python(
+        questions.scalars().all(), from_attributes=True
+    )
+    return JSONResponse(QUESTIONS_ADAPTER.dump_python(
+        questions, mode='json', exclude_none=True
+    )).body
+
+
+async def get_rows_response(session: AsyncSession, quantity: int) -> bytes:
+    """Кортежи Row с полями схемы QuestionDB, сериализация модулем json."""
+    questions = await session.execute(
+        get_question_rows_query().limit(quantity)
+    )
+    return JSONResponse(get_questions_content(
+        [row._mapping for row in questions.all()]
+    )).body
+
+
+async def get_orjson_rows_response(
+        session: AsyncSession,
+        quantity: int
+) -> bytes:
+    """Кортежи Row с полями схемы QuestionDB, сериализация orjson."""
+    questions = await session.execute(
+        get_question_rows_query().limit(quantity)
+    )
+    return ORJSONResponse(get_questions_content(
+        [row._mapping for row in questions.all()]
+    )).body
+
+
+async def measure(
+        session_factory: async_sessionmaker,
+        get_response: Callable[[AsyncSession, int], Awaitable[bytes]],
+        rows: int,
+        requests: int
+) -> tuple[float, float]:
+    """
+    Возвращает процессорное время (мс) и пиковый объем памяти (КБ),
+    выделяемой при обработке запроса, в расчете на один запрос. Память
+    измеряется отдельным проходом, чтобы tracemalloc не искажал время.
+    """
+    async with session_factory() as session:
+        await get_response(session, rows)
+    start = time.process_time()
+    for _ in range(requests):
+        async with session_factory() as session:
+            await get_response(session, rows)
+    cpu_time = time.process_time() - start
+    peak_sizes = []
+    tracemalloc.start()
+    for _ in range(requests):
+        current_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        async with session_factory() as session:
+            await get_response(session, rows)
+        peak_sizes.append(tracemalloc.get_traced_memory()[1] - current_size)
+    tracemalloc.stop()
+    return cpu_time / requests * 1000, sum(peak_sizes) / requests / 1024
+
+
+async def main(rows: int, requests: int) -> None:
+    engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+    session_factory = async_sessionmaker(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Question), [
+            {
+                'package': f'package_{_ // 36}',
+                'tour': f'tour_{_ // 12}',
+                'number': _ % 12 + 1,
+                'question_type': list(QuestionType)[_ % len(QuestionType)],
+                'question': f'Текст вопроса {_} ' * 20,
+                'answer': f'Ответ на вопрос {_}',
+                # часть необязательных полей не заполнена
+                'authors': f'Автор {_}' if _ % 3 else None,
+                'sources': f'Источник {_}',
+                'is_published': True,
+            }
+            for _ in range(rows)
+        ])
+    responses = (
+        ('ORM', get_orm_response),
+        ('Row', get_rows_response),
+        ('Row+orjson', get_orjson_rows_response),
+    )
+    async with session_factory() as session:
+        bodies = {
+            await get_response(session, rows) for _, get_response in responses
+        }
+    assert len(bodies) == 1, 'Способы формирования ответа дают разный JSON.'
+    print(f'{rows} вопросов в ответе, {requests} запросов')
+    print(f'{"":<12}{"CPU, мс":>12}{"память, КБ":>12}')
+    for name, get_response in responses:
+        cpu_time, peak_size = await measure(
+            session_factory, get_response, rows, requests
+        )
+        print(f'{name:<12}{cpu_time:>12.2f}{peak_size:>12.1f}')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     postgres_db_port: str
     postgres_db: str
     sqlite_db_path: str
+    redis_host: str
+    redis_port: str
+    redis_password: SecretStr
 
 
 settings = Settings()
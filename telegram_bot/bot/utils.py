@@ -1,13 +1,25 @@
+from random import random
 import sys
 
 import aiosqlite
 import asyncpg
 from aiogram import types
+from redis import RedisError
+from redis import asyncio as aioredis
 
 from bot.config import settings
 
 from . import logger
 
+# Ключ списка Redis, содержащего пул случайных вопросов
+# (должен совпадать с ключом, используемым приложением сайта)
+QUESTION_POOL_KEY: str = 'question-pool:{}'
+
+redis_client: aioredis.Redis = aioredis.from_url(
+    f'redis://:{settings.redis_password.get_secret_value()}'
+    f'@{settings.redis_host}:{settings.redis_port}'
+)
+
 QUESTION_MAP: dict = {
     'www': 'Ч',
     'brain_ring': 'Б',
@@ -33,18 +45,66 @@ def check_secrets() -> None:
         sys.exit(error_message)
 
 
-async def get_question(question_type: str) -> tuple | None:
-    """Получает случайный вопрос с учетом типа БД."""
-    query = """SELECT question,
+def get_question_query(column: str, operator: str) -> str:
+    """
+    Формирует запрос вопроса заданного типа с учетом типа БД. Условия
+    по статусу вопроса записываются так же, как в частичном индексе БД,
+    иначе индекс не используется.
+    """
+    if settings.database_type == 'postgres':
+        placeholders, is_true, is_false = ('$1', '$2'), 'true', 'false'
+    else:
+        placeholders, is_true, is_false = ('?', '?'), '1', '0'
+    return f"""SELECT question,
                       answer,
                       pass_criteria,
                       comments,
                       authors,
                       sources
                 FROM question
-                WHERE NOT is_condemned AND question_type = $1
-                ORDER BY random()
+                WHERE is_published = {is_true}
+                      AND is_condemned = {is_false}
+                      AND question_type = {placeholders[0]}
+                      AND {column} {operator} {placeholders[1]}
+                ORDER BY random_key
                 LIMIT 1"""
+
+
+async def pop_pooled_question_id(question_type: str) -> int | None:
+    """
+    Извлекает ключ вопроса из пула случайных вопросов, который пополняется
+    Celery-приложением сайта.
+    """
+    try:
+        question_id = await redis_client.lpop(
+            QUESTION_POOL_KEY.format(question_type)
+        )
+    except RedisError as error:
+        logger.error(error, exc_info=True)
+        return None
+    return int(question_id) if question_id else None
+
+
+async def get_question(question_type: str) -> tuple | None:
+    """
+    Получает случайный вопрос с учетом типа БД. Ключ вопроса извлекается
+    из пула случайных вопросов; если пул пуст - выбирается первый вопрос,
+    случайный ключ которого следует за случайно выбранной точкой диапазона
+    [0, 1), при отсутствии такого - первый вопрос с начала диапазона.
+    Для каждого вопроса выбирается новая точка, поэтому последовательно
+    выдаваемые вопросы не образуют непрерывный отрезок порядка ключей.
+    """
+    random_key = random()
+    queries = [
+        (get_question_query('random_key', '>='), (question_type, random_key)),
+        (get_question_query('random_key', '<'), (question_type, random_key)),
+    ]
+    question_id = await pop_pooled_question_id(question_type)
+    if question_id is not None:
+        queries.insert(
+            0, (get_question_query('id', '='), (question_type, question_id))
+        )
+    question = None
     try:
         if settings.database_type == 'postgres':
             conn = await asyncpg.connect(
@@ -54,12 +114,18 @@ async def get_question(question_type: str) -> tuple | None:
                 f':{settings.postgres_db_port}'
                 f'/{settings.postgres_db}'
             )
-            question = await conn.fetchrow(query, question_type)
+            for query, params in queries:
+                question = await conn.fetchrow(query, *params)
+                if question:
+                    break
             await conn.close()
         elif settings.database_type == 'sqlite':
             async with aiosqlite.connect(settings.sqlite_db_path) as conn:
-                cursor = await conn.execute(query, question_type)
-                question = await cursor.fetchone()
+                for query, params in queries:
+                    cursor = await conn.execute(query, params)
+                    question = await cursor.fetchone()
+                    if question:
+                        break
     except Exception as error:
         logger.error(error, exc_info=True)
         return None
@@ -12,12 +12,15 @@ from sqlalchemy.pool import StaticPool
 
 from app.core.db import get_async_session, Base
 from app.core.users import current_superuser, current_user
+from app.crud.questions_catalog import get_catalog_refresh_statements
 from app.models.brain_system import BoughtInProduct, ProductLink, Unit
 from app.models.questions import Question
 from app.models.users import User
+from app.search.dependencies import get_search_backend
+from app.search.sqlite_fts import SQLiteFTSBackend
 
 mock.patch(
-    'fastapi_cache.decorator.cache',
+    'app.core.cache.cache',
     lambda *args, **kwargs: lambda f: f
 ).start()
 # приложения должны быть импортированы после подмены декоратора кэширования
@@ -58,6 +61,8 @@ async def get_async_session_test() -> AsyncGenerator[AsyncSession, None]:
 
 app_api.dependency_overrides[get_async_session] = get_async_session_test
 app_pages.dependency_overrides[get_async_session] = get_async_session_test
+app_api.dependency_overrides[get_search_backend] = SQLiteFTSBackend
+app_pages.dependency_overrides[get_search_backend] = SQLiteFTSBackend
 
 
 @pytest_asyncio.fixture(autouse=True, scope='session')
@@ -74,6 +79,8 @@ async def get_test_database() -> AsyncGenerator[None, None]:
             await aconn.execute(
                 insert(Question).values(gen_data_for_question_table())
             )
+            for statement in get_catalog_refresh_statements():
+                await aconn.execute(statement)
             unit_data, product_data, link_data = gen_data_for_brain_tables()
             await aconn.execute(insert(Unit).values(unit_data))
             await aconn.execute(insert(BoughtInProduct).values(product_data))
@@ -1,8 +1,38 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse, ORJSONResponse
 from httpx import AsyncClient
 import pytest
-from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy import delete, func, insert, or_, select, update
 
-from app.models.questions import Question
+from app.api.utils import get_questions_content
+from app.core.cache import LocalCache, SingleFlight
+from app.core.config import limiter
+import app.core.constants as const
+from app.crud.questions_api import (get_question_rows_query,
+                                    get_random_rows_by_key)
+from app.crud.questions_catalog import get_catalog_refresh_statements
+from app.crud.questions_counters import get_question_counters
+from app.crud.questions_index import QuestionIdIndex
+from app.crud.questions_response_cache import (get_question_cache_key,
+                                               get_user_questions_cache_key,
+                                               question_key_builder,
+                                               user_questions_key_builder)
+from app.crud.questions_search_cache import get_search_cache_key
+from app.elasticsearch.logic import (QUESTION_DELETED_VERSION,
+                                     CircuitBreaker,
+                                     ElasticsearchUnavailableError,
+                                     get_versioned_delete_action,
+                                     get_versioned_index_action,
+                                     is_ignored_bulk_error)
+from app.models.questions import (Question, QuestionCatalog,
+                                  QuestionIndexOutbox)
+from app.main import app_api
+from app.models.users import User
+from app.search.base import SearchBackendUnavailableError, SearchPage
+from app.search.dependencies import get_search_backend
+from app.search.sqlite_fts import SQLiteFTSBackend
 from tests.conftest import async_session_factory_test
 
 
@@ -81,6 +111,87 @@ async def test_questions_search(
     assert len(response.json()) == 1, msg
 
 
+@pytest.mark.asyncio
+async def test_questions_full_text_search(
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование полнотекстового поиска: словоформы должны совпадать,
+    а наиболее релевантный вопрос - выдаваться первым.
+    """
+    url = '/questions/full-text-search'
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': 'вопросы 11', 'quantity': 5},
+    )
+    msg = f'Обращение к эндпойнту "{url}" возвращает статус, отличный от 200.'
+    assert response.status_code == 200, msg
+    msg = (f'Обращение к эндпойнту "{url}" возвращает количество найденных '
+           'вопросов, отличающееся от ожидаемого.')
+    assert len(response.json()) == 5, msg
+    msg = (f'Обращение к эндпойнту "{url}" возвращает первым вопрос, '
+           'не являющийся наиболее релевантным.')
+    assert response.json()[0]['id'] == 11, msg
+    fresh_response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': 'вопросы 11', 'quantity': 5, 'fresh': True},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" с параметром fresh возвращает '
+           'вопросы, отличающиеся от найденных в поисковом индексе.')
+    assert fresh_response.json() == response.json(), msg
+    msg = (f'Обращение к эндпойнту "{url}" не сообщает ступень поиска, '
+           'давшую результат.')
+    assert response.headers.get('X-Search-Stage') == 'stemmed', msg
+
+
+@pytest.mark.asyncio
+async def test_questions_full_text_search_stages(
+    non_authenticated_api_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирование ступеней полнотекстового поиска: если точное совпадение
+    фразы дает достаточно вопросов, следующие ступени не выполняются.
+    """
+    monkeypatch.setattr(limiter, 'enabled', False)
+    url = '/questions/full-text-search'
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': 'вопроса_11', 'quantity': 1},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" при точном совпадении фразы '
+           'возвращает результат не первой ступени поиска.')
+    assert response.headers.get('X-Search-Stage') == 'phrase', msg
+    msg = (f'Обращение к эндпойнту "{url}" при точном совпадении фразы '
+           'возвращает вопрос, отличный от ожидаемого.')
+    assert [_['id'] for _ in response.json()] == [11], msg
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': 'вопроса_11', 'quantity': 5},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" не переходит к следующей '
+           'ступени поиска при недостаточном количестве вопросов.')
+    assert response.headers.get('X-Search-Stage') == 'stemmed', msg
+    assert len(response.json()) == 5, msg
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': 'вопроса_11', 'quantity': 100},
+    )
+    expected_ids = {question['id'] for question in response.json()}
+    ids, params = [], {'search_pattern': 'вопроса_11', 'quantity': 1}
+    while len(ids) <= len(expected_ids):
+        response = await non_authenticated_api_client.get(url, params=params)
+        ids.extend(question['id'] for question in response.json())
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+    msg = (f'Постраничная выдача эндпойнта "{url}" не переходит к следующим '
+           'ступеням поиска или повторяет вопросы: набор найденных '
+           'вопросов зависит от размера страницы.')
+    assert ids[0] == 11 and len(ids) == len(set(ids)), msg
+    assert set(ids) == expected_ids, msg
+
+
 @pytest.mark.asyncio
 async def test_question_add(regular_user_api_client: AsyncClient) -> None:
     """Тестирование добавления вопроса в БД."""
@@ -128,6 +239,53 @@ async def test_question_get(non_authenticated_api_client: AsyncClient) -> None:
     assert response.json()['id'] == 10, msg
 
 
+@pytest.mark.asyncio
+async def test_question_get_not_modified(
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование условной выдачи вопроса: при совпадении версии вопроса
+    у клиента с текущей возвращается ответ 304 без тела.
+    """
+    url = '/questions/10'
+    response = await non_authenticated_api_client.get(url)
+    etag = response.headers.get('ETag')
+    msg = f'Ответ эндпойнта "{url}" не содержит строгого ETag.'
+    assert etag is not None and not etag.startswith('W/'), msg
+    for headers in (
+        {'If-None-Match': etag},
+        {'If-None-Match': f'"0-0", W/{etag}'},
+        {'If-Modified-Since': response.headers['Last-Modified']},
+    ):
+        response = await non_authenticated_api_client.get(
+            url, headers=headers
+        )
+        msg = (f'Условный запрос к эндпойнту "{url}" c заголовками {headers} '
+               'возвращает статус, отличный от 304.')
+        assert response.status_code == 304, msg
+        assert response.content == b'', msg
+    response = await non_authenticated_api_client.get(
+        url, headers={'If-None-Match': '"0-0"'}
+    )
+    msg = (f'Условный запрос к эндпойнту "{url}" с устаревшим ETag '
+           'возвращает статус, отличный от 200.')
+    assert response.status_code == 200, msg
+    # вопрос с тем же id и той же версией (id удаленного вопроса
+    # в SQLite присваивается новому вопросу)
+    async with async_session_factory_test() as session:
+        await session.execute(
+            update(Question).where(Question.id == 10)
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+    response = await non_authenticated_api_client.get(
+        url, headers={'If-None-Match': etag}
+    )
+    msg = (f'Условный запрос к эндпойнту "{url}" с ETag другого вопроса '
+           'с тем же id и версией возвращает статус, отличный от 200.')
+    assert response.status_code == 200, msg
+
+
 @pytest.mark.asyncio
 async def test_question_edit(regular_user_api_client: AsyncClient) -> None:
     """Тестирование выдачи отдельного вопроса."""
@@ -145,6 +303,8 @@ async def test_question_edit(regular_user_api_client: AsyncClient) -> None:
     msg = (f'Изменение вопроса ("{url}") не приводит к изменению '
            'информации в БД.')
     assert modified_question.answer == 'Ответ на вопрос (измененный)', msg
+    msg = f'Изменение вопроса ("{url}") не увеличивает версию вопроса.'
+    assert modified_question.version > 1, msg
     url = '/questions/6'
     response = await regular_user_api_client.patch(url, json=request_body)
     msg = (f'Попытка откорректировать запись ("{url}") пользователем, не '
@@ -203,6 +363,14 @@ async def test_question_status_edit(superuser_api_client: AsyncClient) -> None:
            '"is_condemned" или "is_published" в БД.')
     assert question_statuses.is_condemned is True, msg
     assert question_statuses.is_published is False, msg
+    async with async_session_factory_test() as session:
+        outbox_record = await session.scalar(
+            select(QuestionIndexOutbox)
+            .filter(QuestionIndexOutbox.question_id == 30)
+        )
+    msg = ('Редактирование статуса вопроса не добавляет запись в очередь '
+           'синхронизации поискового индекса.')
+    assert outbox_record is not None, msg
 
 
 @pytest.mark.asyncio
@@ -228,3 +396,640 @@ async def test_users_questions(regular_user_api_client: AsyncClient) -> None:
            'должна содержать только записи, автором которых является '
            'текущий пользователь')
     assert user_id_set == {1}, msg
+    response = await regular_user_api_client.get(
+        url, headers={'If-None-Match': response.headers['ETag']}
+    )
+    msg = (f'Повторный запрос к эндпойнту "{url}" с актуальным ETag '
+           'возвращает статус, отличный от 304.')
+    assert response.status_code == 304, msg
+
+
+@pytest.mark.asyncio
+async def test_random_questions_after_status_edit(
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование выдачи случайных вопросов после изменения статуса вопроса:
+    в выдаче не должно быть повторов и вопросов, не разрешенных к выдаче.
+    """
+    url = '/questions/random-questions'
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'quantity': 100},
+    )
+    msg = f'Обращение к эндпойнту "{url}" возвращает статус, отличный от 200.'
+    assert response.status_code == 200, msg
+    question_ids = [_['id'] for _ in response.json()]
+    msg = f'Выборка случайных вопросов ("{url}") содержит повторы.'
+    assert len(question_ids) == len(set(question_ids)), msg
+    async with async_session_factory_test() as session:
+        published_ids = set(await session.scalars(
+            select(Question.id).filter(
+                Question.is_published.is_(True),
+                Question.is_condemned.is_(False)
+            )
+        ))
+    msg = (f'Выборка случайных вопросов ("{url}") должна содержать все '
+           'разрешенные к выдаче вопросы и только их.')
+    assert set(question_ids) == published_ids, msg
+
+
+@pytest.mark.asyncio
+async def test_random_rows_by_key() -> None:
+    """
+    Тестирование выборки случайных вопросов по случайному ключу: выборка
+    содержит все вопросы, если их меньше запрошенного количества, и не
+    является непрерывным отрезком порядка случайных ключей.
+    """
+    query = select(Question).filter(
+        Question.question_type == 'Ч',
+        Question.is_published.is_(True),
+        Question.is_condemned.is_(False)
+    )
+    async with async_session_factory_test() as session:
+        questions_count = await session.scalar(
+            select(func.count()).select_from(query.subquery())
+        )
+        rows = await get_random_rows_by_key(session, query, 100)
+    question_ids = [_[0].id for _ in rows]
+    msg = ('Выборка по случайному ключу должна содержать все вопросы, '
+           'если запрошено больше вопросов, чем имеется в БД.')
+    assert len(set(question_ids)) == len(question_ids) == questions_count, msg
+    async with async_session_factory_test() as session:
+        rows = await get_random_rows_by_key(session, query, 1)
+    msg = ('Выборка по случайному ключу возвращает количество вопросов, '
+           'отличное от запрошенного.')
+    assert len(rows) == 1, msg
+    query = select(Question).filter(
+        Question.is_published.is_(True),
+        Question.is_condemned.is_(False)
+    )
+    async with async_session_factory_test() as session:
+        ordered_ids = (await session.scalars(
+            query.with_only_columns(Question.id).order_by(Question.random_key)
+        )).all()
+        samples = [
+            {row[0].id for row in await get_random_rows_by_key(
+                session, query, 5
+            )}
+            for _ in range(10)
+        ]
+    runs = [
+        {ordered_ids[(start + i) % len(ordered_ids)] for i in range(5)}
+        for start in range(len(ordered_ids))
+    ]
+    msg = ('Выборка по случайному ключу не должна быть непрерывным отрезком '
+           'порядка случайных ключей.')
+    assert any(sample not in runs for sample in samples), msg
+
+
+@pytest.mark.asyncio
+async def test_question_id_index_changes() -> None:
+    """
+    Тестирование индекса первичных ключей вопросов: изменения статуса
+    вопросов, выполненные в другом процессе, загружаются очередным
+    обновлением индекса, а перестроение индекса не задерживает выборку
+    из прежнего индекса.
+    """
+    index = QuestionIdIndex()
+    async with async_session_factory_test() as session:
+        await index.refresh(session)
+        for is_published in (False, True):
+            await session.execute(
+                update(Question).where(Question.id == 1).values(
+                    is_published=is_published,
+                    updated_at=datetime.now(timezone.utc)
+                )
+            )
+            await session.commit()
+            index._refreshed_at -= const.QUESTION_ID_INDEX_REFRESH_INTERVAL
+            await index.refresh(session)
+            msg = ('Изменение статуса вопроса, выполненное вне текущего '
+                   'процесса, не загружается обновлением индекса.')
+            assert (1 in index.sample(None, len(index))) == is_published, msg
+        index._built_at -= const.REFRESH_INTERVAL
+        async with index._lock:
+            await asyncio.wait_for(index.refresh(session), timeout=1)
+    msg = 'Перестроение индекса удаляет ключи прежнего индекса до замены.'
+    assert len(index.sample(None, 1)) == 1, msg
+
+
+@pytest.mark.asyncio
+async def test_random_questions_pool_fallback(
+    non_authenticated_api_client: AsyncClient,
+    superuser_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование выдачи случайных вопросов при недоступном пуле вопросов:
+    вопросы должны выбираться из БД, а переход к БД - учитываться в метриках.
+    """
+    url = '/questions/random-questions'
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'question_type': 'Что-где-когда', 'quantity': 2},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" при пустом пуле вопросов '
+           'возвращает количество вопросов, отличное от ожидаемого.')
+    assert len(response.json()) == 2, msg
+    response = await superuser_api_client.get('/metrics')
+    msg = ('Переход к выборке вопросов из БД при пустом пуле вопросов '
+           'не учитывается в метриках.')
+    fallbacks = response.json()['counters']['question_pool_fallbacks_total']
+    assert fallbacks >= 1, msg
+
+
+@pytest.mark.asyncio
+async def test_question_catalog_consistency() -> None:
+    """
+    Тестирование актуальности каталога пакетов после изменения вопросов.
+    """
+    async with async_session_factory_test() as session:
+        catalog = await session.execute(
+            select(
+                QuestionCatalog.package,
+                QuestionCatalog.question_type,
+                QuestionCatalog.question_count
+            )
+        )
+        catalog = set(catalog.all())
+        expected_catalog = await session.execute(
+            select(Question.package, Question.question_type, func.count())
+            .filter(
+                Question.is_published.is_(True),
+                Question.is_condemned.is_(False)
+            )
+            .group_by(Question.package, Question.question_type)
+        )
+        expected_catalog = set(expected_catalog.all())
+    msg = ('Каталог пакетов вопросов не соответствует содержимому таблицы '
+           'вопросов после изменения вопросов.')
+    assert catalog == expected_catalog, msg
+
+
+@pytest.mark.asyncio
+async def test_question_catalog_concurrent_refresh() -> None:
+    """
+    Тестирование пересчета каталога пакетов одновременными транзакциями:
+    вставка пересчитанных записей поверх уже вставленных другой транзакцией
+    не должна приводить к дублированию записей.
+    """
+    async with async_session_factory_test() as session:
+        remove, upsert = get_catalog_refresh_statements()
+        await session.execute(remove)
+        await session.execute(upsert)
+        await session.execute(upsert)
+        duplicates = await session.execute(
+            select(QuestionCatalog.package, QuestionCatalog.question_type)
+            .group_by(QuestionCatalog.package, QuestionCatalog.question_type)
+            .having(func.count() > 1)
+        )
+        duplicates = duplicates.all()
+        await session.rollback()
+    msg = 'Повторный пересчет каталога пакетов дублирует записи каталога.'
+    assert duplicates == [], msg
+
+
+@pytest.mark.asyncio
+async def test_question_counters_without_redis() -> None:
+    """
+    Тестирование подсчета вопросов при недоступном хранилище счетчиков:
+    счетчики должны подсчитываться по каталогу вопросов.
+    """
+    async with async_session_factory_test() as session:
+        question_counters = await get_question_counters(session)
+        expected_quantity = await session.execute(
+            select(func.count()).filter(
+                Question.is_published.is_(True),
+                Question.is_condemned.is_(False)
+            )
+        )
+        expected_quantity = expected_quantity.scalar()
+    msg = ('Общее количество вопросов, разрешенных к выдаче, не соответствует '
+           'содержимому таблицы вопросов.')
+    assert question_counters['total'] == expected_quantity, msg
+    msg = ('Сумма счетчиков по категориям вопросов не совпадает с общим '
+           'количеством вопросов, разрешенных к выдаче.')
+    assert sum(
+        quantity for question_type, quantity in question_counters.items()
+        if question_type != 'total'
+    ) == expected_quantity, msg
+
+
+@pytest.mark.asyncio
+async def test_questions_full_text_search_facets(
+    non_authenticated_api_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирование фасетов полнотекстового поиска: количество вопросов
+    по значениям полей должно соответствовать найденным вопросам,
+    а фильтр по пакету - ограничивать выборку.
+    """
+    monkeypatch.setattr(limiter, 'enabled', False)
+    url = '/questions/full-text-search'
+    params = {'search_pattern': 'вопросы', 'quantity': 100, 'facets': True}
+    response = await non_authenticated_api_client.get(url, params=params)
+    msg = f'Обращение к эндпойнту "{url}" возвращает статус, отличный от 200.'
+    assert response.status_code == 200, msg
+    questions, facets = response.json()['questions'], response.json()['facets']
+    msg = (f'Обращение к эндпойнту "{url}" возвращает фасеты, количество '
+           'вопросов в которых не совпадает с количеством найденных вопросов.')
+    for field in ('question_type', 'package'):
+        assert sum(_['count'] for _ in facets[field]) == len(questions), msg
+    response = await non_authenticated_api_client.get(
+        url, params={**params, 'package': 'package_1'}
+    )
+    msg = (f'Обращение к эндпойнту "{url}" с фильтром по пакету возвращает '
+           'вопросы из других пакетов.')
+    assert {
+        _['package'] for _ in response.json()['questions']
+    } == {'package_1'}, msg
+    msg = (f'Обращение к эндпойнту "{url}" с фильтром по пакету возвращает '
+           'фасет пакетов, не соответствующий фильтру.')
+    assert [_['value'] for _ in response.json()['facets']['package']] == [
+        'package_1'
+    ], msg
+
+
+@pytest.mark.asyncio
+async def test_questions_suggest(
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование подсказок при наборе текста: должны выдаваться вопросы,
+    содержащие все слова, последнее из которых не дописано.
+    """
+    url = '/questions/suggest'
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'prefix': 'текст вопр', 'quantity': 3},
+    )
+    msg = f'Обращение к эндпойнту "{url}" возвращает статус, отличный от 200.'
+    assert response.status_code == 200, msg
+    msg = (f'Обращение к эндпойнту "{url}" возвращает количество подсказок, '
+           'отличающееся от запрошенного.')
+    assert len(response.json()) == 3, msg
+    msg = (f'Обращение к эндпойнту "{url}" возвращает подсказки, '
+           'не начинающиеся с набранного текста.')
+    assert all(
+        suggestion['question'].startswith('Текст вопроса_')
+        for suggestion in response.json()
+    ), msg
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'prefix': 'вопрос текстт'},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" возвращает подсказки для текста, '
+           'слова которого не встречаются в вопросах.')
+    assert response.json() == [], msg
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('url, search_pattern', [
+    ('/questions/search', 'вопроса'),
+    ('/questions/full-text-search', 'вопросы'),
+])
+async def test_questions_search_pagination(
+    non_authenticated_api_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    url: str,
+    search_pattern: str
+) -> None:
+    """
+    Тестирование постраничной выдачи результатов поиска: страницы,
+    полученные по курсору, должны в совокупности совпадать с выдачей
+    одним запросом.
+    """
+    monkeypatch.setattr(limiter, 'enabled', False)
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': search_pattern, 'quantity': 100},
+    )
+    expected_ids = [question['id'] for question in response.json()]
+    msg = (f'Обращение к эндпойнту "{url}" возвращает курсор следующей '
+           'страницы, хотя все найденные вопросы уже выданы.')
+    assert 'X-Next-Cursor' not in response.headers, msg
+    ids, params = [], {'search_pattern': search_pattern, 'quantity': 7}
+    while True:
+        response = await non_authenticated_api_client.get(url, params=params)
+        ids.extend(question['id'] for question in response.json())
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+    msg = (f'Обращение к эндпойнту "{url}" по курсорам возвращает вопросы, '
+           'отличающиеся от выдачи одним запросом.')
+    assert ids == expected_ids, msg
+    response = await non_authenticated_api_client.get(
+        url,
+        params={'search_pattern': search_pattern, 'cursor': 'курсор'},
+    )
+    msg = (f'Обращение к эндпойнту "{url}" с некорректным курсором '
+           'возвращает статус, отличный от 400.')
+    assert response.status_code == 400, msg
+
+
+class UnavailableSearchBackend(SQLiteFTSBackend):
+    """Поисковый движок, ступени которого недоступны."""
+
+    async def search_questions_at_stage(self, *args, **kwargs) -> SearchPage:
+        raise SearchBackendUnavailableError
+
+
+@pytest.mark.asyncio
+async def test_questions_search_unavailable_backend(
+    non_authenticated_api_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирование недоступности поискового движка: первая страница
+    выдается резервной ступенью, а следующая страница ступени движка
+    не выдается с начала резервной ступени.
+    """
+    monkeypatch.setattr(limiter, 'enabled', False)
+    url = '/questions/full-text-search'
+    params = {'search_pattern': 'вопросы', 'quantity': 2}
+    response = await non_authenticated_api_client.get(url, params=params)
+    cursor = response.headers['X-Next-Cursor']
+    monkeypatch.setitem(
+        app_api.dependency_overrides, get_search_backend,
+        UnavailableSearchBackend
+    )
+    response = await non_authenticated_api_client.get(url, params=params)
+    msg = (f'Обращение к эндпойнту "{url}" при недоступности поискового '
+           'движка не выполняется резервной ступенью.')
+    assert (
+        response.status_code == 200
+        and response.headers['X-Search-Stage'] == 'fallback'
+    ), msg
+    response = await non_authenticated_api_client.get(
+        url, params={**params, 'cursor': cursor}
+    )
+    msg = (f'Обращение к эндпойнту "{url}" с курсором ступени поискового '
+           'движка при его недоступности возвращает статус, отличный '
+           'от 503.')
+    assert response.status_code == 503, msg
+    assert 'Retry-After' in response.headers, msg
+
+
+def test_search_cache_key_normalization() -> None:
+    """
+    Тестирование ключа кэша результатов поиска: шаблоны, отличающиеся
+    только регистром и пробелами, должны иметь один ключ.
+    """
+    msg = ('Ключ кэша результатов поиска зависит от регистра символов '
+           'или количества пробелов в шаблоне поиска.')
+    assert get_search_cache_key(
+        'full-text', ' Вопросы   11 ', 'Ч', 5
+    ) == get_search_cache_key('full-text', 'вопросы 11', 'Ч', 5), msg
+    msg = ('Ключ кэша результатов поиска не учитывает тип вопросов '
+           'или количество вопросов в выдаче.')
+    assert len({
+        get_search_cache_key('full-text', 'вопросы', question_type, quantity)
+        for question_type, quantity in (('Ч', 5), (None, 5), ('Ч', 10))
+    }) == 3, msg
+
+
+@pytest.mark.asyncio
+async def test_elasticsearch_circuit_breaker() -> None:
+    """Тестирование размыкания и замыкания предохранителя Elasticsearch."""
+    calls = []
+
+    async def failing_call() -> None:
+        calls.append('failing')
+        raise TimeoutError
+
+    async def successful_call() -> str:
+        calls.append('successful')
+        return 'ok'
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(ElasticsearchUnavailableError):
+            await breaker.call(failing_call)
+    msg = 'Предохранитель не размыкается после серии ошибок.'
+    assert breaker.state == CircuitBreaker.OPEN, msg
+    with pytest.raises(ElasticsearchUnavailableError):
+        await breaker.call(successful_call)
+    msg = 'Разомкнутый предохранитель пропускает обращения к Elasticsearch.'
+    assert calls == ['failing', 'failing'], msg
+    breaker.reset_timeout = 0
+    msg = 'Пробное обращение не выполняется по истечении reset_timeout.'
+    assert await breaker.call(successful_call) == 'ok', msg
+    msg = 'Предохранитель не замыкается после успешного пробного обращения.'
+    assert breaker.state == CircuitBreaker.CLOSED, msg
+
+
+@pytest.mark.asyncio
+async def test_elasticsearch_circuit_breaker_cancelled_probe() -> None:
+    """
+    Тестирование отмены пробного обращения: предохранитель не должен
+    оставаться в полуоткрытом состоянии, отклоняя все обращения.
+    """
+    async def failing_call() -> None:
+        raise TimeoutError
+
+    async def slow_call() -> None:
+        await asyncio.sleep(60)
+
+    async def successful_call() -> str:
+        return 'ok'
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    with pytest.raises(ElasticsearchUnavailableError):
+        await breaker.call(failing_call)
+    probe = asyncio.create_task(breaker.call(slow_call))
+    await asyncio.sleep(0)
+    msg = ('Пробное обращение не переводит предохранитель в полуоткрытое '
+           'состояние.')
+    assert breaker.state == CircuitBreaker.HALF_OPEN, msg
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    msg = ('После отмены пробного обращения предохранитель остается '
+           'в полуоткрытом состоянии.')
+    assert breaker.state == CircuitBreaker.OPEN, msg
+    msg = 'После отмены пробного обращения не выполняется новое пробное.'
+    assert await breaker.call(successful_call) == 'ok', msg
+    assert breaker.state == CircuitBreaker.CLOSED, msg
+
+
+@pytest.mark.asyncio
+async def test_reindex_versioned_actions() -> None:
+    """
+    Тестирование команд bulk API для индекса, в который выполняется
+    переиндексация: документы записываются с внешней версией вопроса,
+    а удаление вопроса из БД не может быть отменено загрузкой вопроса.
+    """
+    async with async_session_factory_test() as session:
+        question = (await session.execute(
+            get_question_rows_query().add_columns(Question.version)
+            .filter(Question.id == 1)
+        )).one()
+    action = get_versioned_index_action('question_index_v1', question)
+    msg = 'Документ вопроса записывается без внешней версии вопроса.'
+    assert (
+        action['_version'] == question.version
+        and action['_version_type'] == 'external'
+        and action['pk'] == 1
+    ), msg
+    msg = ('Удаление вопроса из БД записывается с версией, не превышающей '
+           'версию загружаемого вопроса.')
+    action = get_versioned_delete_action('question_index_v1', 1, None)
+    assert action['_version'] == QUESTION_DELETED_VERSION, msg
+    action = get_versioned_delete_action('question_index_v1', 1, 3)
+    msg = 'Снятие вопроса с выдачи записывается без версии вопроса.'
+    assert action['_version'] == 3, msg
+    msg = 'Конфликт версий документа считается ошибкой синхронизации.'
+    assert is_ignored_bulk_error({'index': {'status': 409}}), msg
+    assert is_ignored_bulk_error({'delete': {'status': 404}}), msg
+    msg = 'Ошибка индексации документа не считается ошибкой синхронизации.'
+    assert not is_ignored_bulk_error({'index': {'status': 400}}), msg
+
+
+def test_response_cache_keys() -> None:
+    """
+    Тестирование ключей кэша ответов: ключи зависят только от id ресурса
+    и ETag его версии.
+    """
+    user = User(id=7)
+    msg = 'Ключ кэша вопроса зависит не только от id и версии вопроса.'
+    assert question_key_builder(
+        None, kwargs={'id': 10, 'etag': '"10-2"', 'session': object()}
+    ) == get_question_cache_key(10, '"10-2"'), msg
+    msg = 'Ключ кэша вопроса не изменяется при изменении версии вопроса.'
+    assert get_question_cache_key(10, '"10-2"') != get_question_cache_key(
+        10, '"10-3"'
+    ), msg
+    msg = 'Ключ кэша вопросов пользователя зависит не только от его id.'
+    assert user_questions_key_builder(
+        None, kwargs={'user': user, 'etag': '"7-1"', 'session': object()}
+    ) == get_user_questions_cache_key(7, '"7-1"'), msg
+
+
+def test_local_cache_eviction() -> None:
+    """Тестирование вытеснения и устаревания записей кэша процесса."""
+    local_cache = LocalCache(max_size=2)
+    local_cache.set('first', 1, 60)
+    local_cache.set('second', 2, 60)
+    local_cache.get('first')
+    local_cache.set('third', 3, 60)
+    msg = 'Из кэша процесса вытесняется не самая давно использованная запись.'
+    assert local_cache.get('second') == (False, None), msg
+    assert local_cache.get('first') == (True, 1), msg
+    local_cache.set('expired', 4, 0)
+    msg = 'Кэш процесса выдает устаревшую запись.'
+    assert local_cache.get('expired') == (False, None), msg
+
+
+@pytest.mark.asyncio
+async def test_single_flight() -> None:
+    """
+    Тестирование объединения одновременных вычислений: значение для ключа
+    вычисляется один раз, исключение получают все ожидающие.
+    """
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute() -> int:
+        calls.append('compute')
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def fail() -> None:
+        calls.append('fail')
+        await asyncio.sleep(0.01)
+        raise ValueError
+
+    results = await asyncio.gather(
+        *(single_flight.run('key', compute) for _ in range(5))
+    )
+    msg = 'Одновременные вычисления одного значения не объединяются.'
+    assert results == [42] * 5 and calls == ['compute'], msg
+    results = await asyncio.gather(
+        *(single_flight.run('key', fail) for _ in range(3)),
+        return_exceptions=True
+    )
+    msg = 'Исключение вычисления не передается ожидающим корутинам.'
+    assert all(isinstance(_, ValueError) for _ in results), msg
+    assert calls == ['compute', 'fail'], msg
+
+
+@pytest.mark.asyncio
+async def test_orjson_questions_response() -> None:
+    """
+    Тестирование сериализации списков вопросов библиотекой orjson: ответ
+    должен побайтно совпадать с ответом JSONResponse.
+    """
+    async with async_session_factory_test() as session:
+        questions = await session.execute(
+            get_question_rows_query().limit(100)
+        )
+    content = get_questions_content(
+        [row._mapping for row in questions.all()]
+    )
+    content.append({'id': 0, 'question': 'Вопрос "в кавычках"\n\t\u2028'})
+    msg = 'Ответ ORJSONResponse не совпадает с ответом JSONResponse.'
+    assert ORJSONResponse(content).body == JSONResponse(content).body, msg
+
+
+@pytest.mark.asyncio
+async def test_api_response_compression(
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тестирование сжатия ответов API: сжимаются только ответы, размер
+    которых не меньше GZIP_MINIMUM_SIZE.
+    """
+    url = '/questions/random-package'
+    response = await non_authenticated_api_client.get(
+        url, headers={'Accept-Encoding': 'gzip'}
+    )
+    msg = f'Ответ эндпойнта "{url}" не сжимается.'
+    assert response.headers.get('Content-Encoding') == 'gzip', msg
+    url = '/questions/1000000'
+    response = await non_authenticated_api_client.get(
+        url, headers={'Accept-Encoding': 'gzip'}
+    )
+    msg = f'Ответ эндпойнта "{url}" небольшого размера сжимается.'
+    assert 'Content-Encoding' not in response.headers, msg
+
+
+@pytest.mark.asyncio
+async def test_api_compressed_response_etag(
+    regular_user_api_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Тестирование ETag сжатых ответов: сжатое и несжатое представления
+    ресурса имеют разные ETag, и каждый из них подтверждается ответом 304.
+    """
+    monkeypatch.setattr(limiter, 'enabled', False)
+    url = '/users/questions'
+    response = await regular_user_api_client.get(
+        url, headers={'Accept-Encoding': 'gzip'}
+    )
+    gzip_etag = response.headers['ETag']
+    msg = f'Ответ эндпойнта "{url}" не сжимается.'
+    assert response.headers.get('Content-Encoding') == 'gzip', msg
+    response = await regular_user_api_client.get(
+        url, headers={'Accept-Encoding': 'identity'}
+    )
+    etag = response.headers['ETag']
+    msg = (f'Сжатый и несжатый ответы эндпойнта "{url}" имеют одинаковый '
+           'строгий ETag.')
+    assert gzip_etag != etag, msg
+    for accept_encoding, expected_etag in (
+        ('gzip', gzip_etag), ('identity', etag)
+    ):
+        response = await regular_user_api_client.get(
+            url,
+            headers={
+                'Accept-Encoding': accept_encoding,
+                'If-None-Match': expected_etag
+            }
+        )
+        msg = (f'Обращение к эндпойнту "{url}" с ETag полученного ранее '
+               f'ответа ({accept_encoding}) возвращает статус, отличный '
+               'от 304, или другой ETag.')
+        assert response.status_code == 304, msg
+        assert response.headers['ETag'] == expected_etag, msg
@@ -83,3 +83,20 @@ async def test_edit_question_status_allowed_for_superuser_only(
     response_regular_user = await regular_user_api_client.patch(url)
     assert response_anon_user.status_code == 401, msg
     assert response_regular_user.status_code == 401, msg
+
+
+@pytest.mark.asyncio
+async def test_metrics_allowed_for_superuser_only(
+    regular_user_api_client: AsyncClient,
+    non_authenticated_api_client: AsyncClient
+) -> None:
+    """
+    Тест недоступности метрик для любого пользователя кроме администратора.
+    """
+    url = '/metrics'
+    msg = (f'Обращение к эндпойнту "{url}" от пользователя, не являющегося'
+           ' администратором, не возвращает статус 401.')
+    response_anon_user = await non_authenticated_api_client.get(url)
+    response_regular_user = await regular_user_api_client.get(url)
+    assert response_anon_user.status_code == 401, msg
+    assert response_regular_user.status_code == 401, msg
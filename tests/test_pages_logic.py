@@ -1,3 +1,5 @@
+import re
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import func, select
@@ -59,6 +61,17 @@ async def test_getting_random_questions(pages_client: AsyncClient) -> None:
     msg = (f'Запрос на поиск вопроса по тексту ("{url}") не возвращает '
            'ожидаемое количество вопросов.')
     assert response_html.count('Текст вопроса_') == 1, msg
+    form_data = {
+        'search_pattern': 'Текст вопроса',
+        'questions_quantity': 5
+    }
+    response = await pages_client.post(url, data=form_data)
+    question_texts = re.findall(
+        r'Текст вопроса_\d+', response.content.decode()
+    )
+    msg = (f'Запрос на поиск вопросов по тексту ("{url}") должен возвращать '
+           'запрошенное количество различных вопросов.')
+    assert len(set(question_texts)) == len(question_texts) == 5, msg
 
 
 @pytest.mark.asyncio